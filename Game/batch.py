@@ -0,0 +1,320 @@
+""" File containing the batch simulator: many games advanced together with NumPy.
+
+The state of every game (walls, contents, walkers, health, treasure) is kept
+in arrays with one row per game, and a turn is resolved for all the games at
+once with the rules of Game.play_turn. The player follows a random policy.
+
+The random draws come from a counter-based generator: the n-th draw of a turn
+of a game only depends on (seed, game, turn, n). A Game driven by CounterRandom
+with the same seed therefore plays exactly the same turns as the batch.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+from cfg import ACTIONS, CONTENTS, DIRECTIONS, HUNT_RADIUS, WALL_BITS
+
+EMPTY, RIVER, EXIT, TREASURE, MAP, WORMHOLE = [CONTENTS.index(content) for content in
+                                               ['empty', 'river', 'exit', 'treasure', 'map', 'wormhole']]
+
+_MASK = 2 ** 64 - 1
+
+
+def _mix(value):
+    """ splitmix64 finalizer of a python int. """
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def _mix_array(values):
+    """ splitmix64 finalizer of an uint64 array (the products wrap around). """
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def uniform(seed: int, game: int, turn: int, draw: int):
+    """ Return the uniform number in [0, 1) of a draw of a turn of a game. """
+    value = _mix(_mix(_mix(_mix(seed & _MASK) ^ game) ^ turn) ^ draw)
+    return (value >> 11) / 2 ** 53
+
+
+class CounterRandom:
+    """
+    Drop-in for the random module in Game, drawing the same numbers as the batch.
+    Call start_turn before each turn of the game.
+    """
+
+    def __init__(self, seed: int, game: int = 0):
+        self.seed = seed
+        self.game = game
+        self.turn = 0
+        self.draw = 0
+
+    def start_turn(self, turn: int):
+        self.turn = turn
+        self.draw = 0
+
+    def random(self):
+        value = uniform(self.seed, self.game, self.turn, self.draw)
+        self.draw += 1
+        return value
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+
+class BatchSimulator:
+    """ Games of the same labyrinth size and enemies, advanced together. """
+
+    def __init__(self, games: list, seed: int = 0):
+        """ Copy the state of placed games (see Game.place_player and Game.place_enemies).
+
+        Parameters
+        ----------
+        games : list of Game, all with the same labyrinth size and enemy types
+        seed : seed of the random draws
+        """
+        size = games[0].labyrinth.size
+        self.size = size
+        self.seed = seed
+        self.turn = 0
+        self.n_games = len(games)
+
+        n_cells = size ** 2
+        self.walls = np.array([np.frombuffer(game.labyrinth.walls, dtype=np.uint8) for game in games])
+        self.contents = np.array([[CONTENTS.index(cell.content) for cell in game.labyrinth.cells]
+                                  for game in games], dtype=np.int8)
+        # Open neighbours of each cell (see Labyrinth.exits), padded with -1.
+        self.n_exits = np.array([[len(exits) for exits in game.labyrinth.exits] for game in games], dtype=np.int32)
+        self.exits = np.array([[exits + [-1] * (4 - len(exits)) for exits in game.labyrinth.exits]
+                               for game in games], dtype=np.int32)
+
+        # Rivers padded to the longest one, river_index is -1 out of the river.
+        self.river_length = np.array([len(game.labyrinth.river) for game in games], dtype=np.int32)
+        self.river = np.zeros((self.n_games, max(self.river_length)), dtype=np.int32)
+        self.river_index = np.full((self.n_games, n_cells), -1, dtype=np.int32)
+        # Destination of each wormhole, -1 elsewhere.
+        self.wormhole_next = np.full((self.n_games, n_cells), -1, dtype=np.int32)
+        for g, game in enumerate(games):
+            for cell, i in game.labyrinth.river_index.items():
+                self.river[g, i] = cell
+                self.river_index[g, cell] = i
+            for cell, next_cell in game.labyrinth.wormhole_next.items():
+                self.wormhole_next[g, cell] = next_cell
+
+        self.exit = np.array([game.labyrinth.exit for game in games], dtype=np.int32)
+        self.player = np.array([game.player.position for game in games], dtype=np.int32)
+        self.health = np.array([game.player.health for game in games], dtype=np.int32)
+        self.treasure = np.array([game.player.have_treasure for game in games], dtype=bool)
+        self.enemies = np.array([[enemy.position for enemy in game.enemies] for game in games],
+                                dtype=np.int32).reshape(self.n_games, len(games[0].enemies))
+        self.enemy_speed = [enemy.speed for enemy in games[0].enemies]
+        self.enemy_damage = [enemy.damage for enemy in games[0].enemies]
+        self.enemy_hunts = [enemy.hunts for enemy in games[0].enemies]
+        # Distances to the player of the cells around it (see FlowField), -1 further away.
+        self.distance = np.full((self.n_games, n_cells), -1, dtype=np.int32)
+        self.game_over = np.array([game.game_over for game in games], dtype=bool)
+        self.won = np.zeros(self.n_games, dtype=bool)
+
+        self.game_ids = np.arange(self.n_games, dtype=np.uint64)
+        self.draws = np.zeros(self.n_games, dtype=np.uint64)
+        directions = [DIRECTIONS[action] for action in ACTIONS[:4]]
+        self.offsets = np.array([dx + dy * size for dx, dy in directions], dtype=np.int32)
+        self.bits = np.array([WALL_BITS[direction] for direction in directions], dtype=np.uint8)
+
+    def _choice(self, games, n):
+        """ Draw an index in range(n) for each of the games (array of game indexes, n an int or an array). """
+        values = _mix_array(_mix_array(_mix_array(_mix_array(np.full(len(games), self.seed & _MASK,
+                                                                     dtype=np.uint64))
+                                                  ^ self.game_ids[games]) ^ np.uint64(self.turn))
+                            ^ self.draws[games])
+        self.draws[games] += np.uint64(1)
+        return ((values >> np.uint64(11)).astype(np.float64) / 2 ** 53 * n).astype(np.int64)
+
+    def _move(self, games, cells):
+        """ Draw an open neighbour of the cell of each game. """
+        return self.exits[games, cells, self._choice(games, self.n_exits[games, cells])]
+
+    def step(self, actions=None):
+        """ Play one turn of every game which is not over.
+
+        Parameters
+        ----------
+        actions : indexes in ACTIONS of the player actions, random if not given
+        """
+        games = np.flatnonzero(~self.game_over)
+        self.draws[:] = 0
+        if actions is None:
+            actions = self._choice(games, len(ACTIONS))
+        else:
+            actions = np.asarray(actions)[games]
+
+        # Player moves.
+        moving = actions < 4
+        is_open = (self.walls[games[moving], self.player[games[moving]]]
+                   & self.bits[actions[moving]]) == 0
+        moved = games[moving][is_open]
+        self.player[moved] += self.offsets[actions[moving][is_open]]
+
+        # Activations, the turn is only played if something happened.
+        activating = actions == ACTIONS.index('activate')
+        content = self.contents[games, self.player[games]]
+        played = ~activating | (content == WORMHOLE) | (content == TREASURE)
+
+        found_map = games[activating & (content == MAP)]
+        self.contents[found_map, self.player[found_map]] = EMPTY
+        teleported = games[activating & (content == WORMHOLE)]
+        self.player[teleported] = self.wormhole_next[teleported, self.player[teleported]]
+        found_treasure = games[activating & (content == TREASURE)]
+        self.treasure[found_treasure] = True
+        self.contents[found_treasure, self.player[found_treasure]] = EMPTY
+
+        games = games[played]
+
+        # The river carries the player two cells downstream.
+        drifting = games[self.contents[games, self.player[games]] == RIVER]
+        river_index = np.minimum(self.river_index[drifting, self.player[drifting]] + 2,
+                                 self.river_length[drifting] - 1)
+        self.player[drifting] = self.river[drifting, river_index]
+
+        if any(self.enemy_hunts):
+            self._flow_field(games)
+        for e in range(self.enemies.shape[1]):
+            self._move_enemy(games, e)
+
+        self.won[games] = (self.player[games] == self.exit[games]) & self.treasure[games]
+        self.game_over[games] = self.won[games] | (self.health[games] <= 0)
+        self.turn += 1
+
+    def _flow_field(self, games):
+        """ Breadth-first search of the distances to the player, up to HUNT_RADIUS, in every game. """
+        n_cells = self.distance.shape[1]
+        self.distance[games] = -1
+        self.distance[games, self.player[games]] = 0
+        rows, cells = games, self.player[games]
+        for steps in range(1, HUNT_RADIUS + 1):
+            neighbours = self.exits[rows, cells].ravel()
+            rows = np.repeat(rows, 4)
+            new = neighbours >= 0
+            rows, neighbours = rows[new], neighbours[new]
+            new = self.distance[rows, neighbours] < 0
+            if not new.any():
+                break
+            # A cell reached from several frontier cells is kept once.
+            keys = np.unique(rows[new].astype(np.int64) * n_cells + neighbours[new])
+            rows, cells = keys // n_cells, (keys % n_cells).astype(np.int32)
+            self.distance[rows, cells] = steps
+
+    def _hunt(self, games, cells):
+        """ Return the first open neighbour of the cell of each game one step closer to the player.
+
+        Every cell must be at a positive distance of the player.
+        """
+        neighbours = self.exits[games, cells]
+        closer = self.distance[games[:, None], neighbours] == self.distance[games, cells][:, None] - 1
+        closer &= neighbours >= 0
+        return neighbours[np.arange(len(games)), closer.argmax(axis=1)]
+
+    def _move_enemy(self, games, e: int):
+        """ Move the enemy e in every game, hitting the player it meets.
+
+        A hunter in reach of the player steps towards it, the other enemies walk at random.
+        """
+        for _ in range(self.enemy_speed[e]):
+            if self.enemy_hunts[e]:
+                hunting = self.distance[games, self.enemies[games, e]] > 0
+                self.enemies[games[hunting], e] = self._hunt(games[hunting], self.enemies[games[hunting], e])
+                wandering = games[~hunting]
+                self.enemies[wandering, e] = self._move(wandering, self.enemies[wandering, e])
+            else:
+                self.enemies[games, e] = self._move(games, self.enemies[games, e])
+
+            hit = games[self.enemies[games, e] == self.player[games]]
+            if len(hit):
+                self.health[hit] -= self.enemy_damage[e]
+                for g in hit[self.treasure[hit]]:
+                    cell = self._drop_cell(g, self.player[g])
+                    if cell >= 0:
+                        self.contents[g, cell] = TREASURE
+                        self.treasure[g] = False
+
+                # Knock the player back through an open side.
+                self.player[hit] = self._move(hit, self.player[hit])
+
+    def _drop_cell(self, g: int, cell: int):
+        """ Return the empty cell of the game g nearest to the cell, -1 if none (see Game.drop_position). """
+        exits, contents = self.exits[g], self.contents[g]
+        seen = {int(cell)}
+        queue = deque([int(cell)])
+        while queue:
+            cell = queue.popleft()
+            if contents[cell] == EMPTY:
+                return cell
+            for neighbour in exits[cell, :self.n_exits[g, cell]].tolist():
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return -1
+
+    def run(self, turns: int):
+        """ Play until every game is over or for the given number of turns.
+
+        Returns
+        -------
+        stats : dict with the number of games, turns, wins, deaths, seconds and games per second
+        """
+        start = time.perf_counter()
+        for _ in range(turns):
+            if self.game_over.all():
+                break
+            self.step()
+        seconds = time.perf_counter() - start
+        return {
+            'games': self.n_games,
+            'turns': self.turn,
+            'wins': int(self.won.sum()),
+            'deaths': int((self.game_over & ~self.won).sum()),
+            'seconds': seconds,
+            'games_per_second': self.n_games / seconds if seconds else float('inf'),
+            'game_turns_per_second': self.n_games * self.turn / seconds if seconds else float('inf')
+        }
+
+
+def play_like_batch(game, seed: int, index: int, turns: int):
+    """ Play a placed Game with the draws the batch would use for the game at index. """
+    rng = CounterRandom(seed, index)
+    game.rng = rng
+    for turn in range(turns):
+        if game.game_over:
+            break
+        rng.start_turn(turn)
+        game.play_turn(rng.choice(ACTIONS))
+
+
+def compare_with_games(games: list, seed: int, turns: int):
+    """ Run the games in a batch and one by one with the same draws.
+
+    The games are modified by the scalar run, pass copies.
+
+    Returns
+    -------
+    mismatches : list of the indexes of the games whose final states differ
+    """
+    batch = BatchSimulator(games, seed)
+    batch.run(turns)
+    mismatches = []
+    for g, game in enumerate(games):
+        play_like_batch(game, seed, g, batch.turn)
+        state = ([game.player.position] + [enemy.position for enemy in game.enemies],
+                 game.player.health, game.player.have_treasure, game.game_over)
+        batch_state = ([int(batch.player[g])] + [int(cell) for cell in batch.enemies[g]],
+                       int(batch.health[g]), bool(batch.treasure[g]), bool(batch.game_over[g]))
+        if state != batch_state:
+            mismatches.append(g)
+    return mismatches
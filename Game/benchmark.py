@@ -0,0 +1,331 @@
+""" File containing the performance benchmarks of the game.
+
+Run from the Game directory, for example:
+    python benchmark.py generators --sizes 16 64 256 1024
+    python benchmark.py construction --sizes 4 64 1024 4096
+    python benchmark.py chunked --size 32768 --turns 100000
+    python benchmark.py hunters --size 64 --hunters 1 10 100
+    python benchmark.py solver --sizes 8 12 32 --seeds 1000
+    python benchmark.py startup
+"""
+
+import argparse
+import copy
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from cfg import ACTIONS, ALL_WALLS, LEVELS, MAZE_ALGORITHM
+from enemy import Enemy
+from game import Game
+from generators import GENERATORS, carve
+from labyrinth import Labyrinth
+from player import Player
+
+
+def bench_generators(sizes, repeat: int = 1):
+    """ Time every maze generation algorithm on fully walled grids.
+
+    Returns
+    -------
+    rows : list of (algorithm, size, seconds), best time of the repeats
+    """
+    rows = []
+    for algorithm in GENERATORS:
+        for size in sizes:
+            timings = []
+            for _ in range(repeat):
+                walls = bytearray([ALL_WALLS]) * (size ** 2)
+                start = time.perf_counter()
+                carve(size, walls, algorithm)
+                timings.append(time.perf_counter() - start)
+            rows.append((algorithm, size, min(timings)))
+    return rows
+
+
+CONSTRUCTION_STAGES = ['_init_cells', '_init_river', '_init_junctions', '_init_exits', '_init_objects']
+
+
+class TimedLabyrinth(Labyrinth):
+    """ Labyrinth recording the wall time and the peak memory of each construction stage.
+
+    The peak memory is only measured while tracemalloc is tracing, which slows the stages down.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.stages = {}
+        super().__init__(*args, **kwargs)
+
+    def _timed(self, stage: str, *args):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = getattr(super(), stage)(*args)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - memory if tracemalloc.is_tracing() else None
+        self.stages[stage] = (seconds, peak)
+        return result
+
+    def _init_cells(self):
+        return self._timed('_init_cells')
+
+    def _init_river(self):
+        return self._timed('_init_river')
+
+    def _init_junctions(self, wall_p: float):
+        return self._timed('_init_junctions', wall_p)
+
+    def _init_exits(self):
+        return self._timed('_init_exits')
+
+    def _init_objects(self):
+        return self._timed('_init_objects')
+
+
+def bench_construction(sizes, seed: int = 0, memory: bool = True):
+    """ Build a labyrinth of each size and measure its construction stages.
+
+    The stages are timed on a first build. Their peak memory, above the memory
+    in use when the stage starts, is measured on a second build of the same seed
+    traced by tracemalloc (nan if memory is False).
+
+    Returns
+    -------
+    rows : list of (stage, size, seconds, peak MiB), then the total of each size
+    """
+    rows = []
+    for size in sizes:
+        timed = TimedLabyrinth(size, seed=seed).stages
+        peaks = {stage: float('nan') for stage in CONSTRUCTION_STAGES}
+        if memory:
+            tracemalloc.start()
+            traced = TimedLabyrinth(size, seed=seed).stages
+            tracemalloc.stop()
+            peaks = {stage: traced[stage][1] / 2 ** 20 for stage in CONSTRUCTION_STAGES}
+
+        for stage in CONSTRUCTION_STAGES:
+            rows.append((stage, size, timed[stage][0], peaks[stage]))
+        rows.append(('total', size, sum(seconds for seconds, _ in timed.values()), max(peaks.values())))
+    return rows
+
+
+def bench_chunked(size: int, turns: int, level: str, seed: int = 0):
+    """ Play a random game in a chunked labyrinth, measuring the memory of the generated chunks.
+
+    Returns
+    -------
+    rows : list of (turns, chunks in memory, chunks generated, seconds, peak MiB)
+    """
+    from chunked_labyrinth import ChunkedLabyrinth
+
+    tracemalloc.start()
+    labyrinth = ChunkedLabyrinth(size, seed)
+    game = Game(labyrinth, Player('bench'), [Enemy(enemy_type=enemy_type) for enemy_type in LEVELS[level]],
+                seed=seed)
+    game.place_player()
+    game.place_enemies()
+    rng = random.Random(seed)
+
+    played = 0
+    start = time.perf_counter()
+    while played < turns and not game.game_over:
+        game.play_turn(rng.choice(ACTIONS))
+        played += 1
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return [(played, len(labyrinth.chunks), labyrinth.n_generated, seconds, peak)]
+
+
+def bench_hunters(size: int, counts, turns: int, seed: int = 0):
+    """ Play random games against hunters only, the way to the player being searched once per turn.
+
+    Returns
+    -------
+    rows : list of (hunters, size, turns, seconds, turns per second)
+    """
+    rows = []
+    for count in counts:
+        game = Game(Labyrinth(size, seed=seed), Player('bench'), [Enemy(enemy_type=4) for _ in range(count)],
+                    seed=seed)
+        game.place_player()
+        game.place_enemies()
+        # The hunters never kill the player, only the speed of the turns is measured.
+        game.player.health = float('inf')
+        rng = random.Random(seed)
+
+        start = time.perf_counter()
+        for _ in range(turns):
+            game.play_turn(rng.choice(ACTIONS))
+        seconds = time.perf_counter() - start
+        rows.append((count, size, turns, seconds, turns / seconds))
+    return rows
+
+
+def bench_solver(sizes, n_seeds: int, algorithm: str = MAZE_ALGORITHM):
+    """ Generate and validate the labyrinths of the first seeds of each size (see solver.validate_seeds).
+
+    Returns
+    -------
+    rows : list of (size, labyrinths, failures, mean difficulty, seconds, labyrinths per minute)
+    """
+    from solver import validate_seeds
+
+    rows = []
+    for size in sizes:
+        stats = validate_seeds(size, range(n_seeds), algorithm)
+        rows.append((size, stats['labyrinths'], len(stats['failures']), stats['mean_difficulty'],
+                     stats['seconds'], stats['labyrinths_per_minute']))
+    return rows
+
+
+STARTUP_MODULES = ['cfg', 'labyrinth', 'game', 'batch', 'solver', 'pygame_renderer']
+
+# Run in a fresh interpreter: print the import time of the module and whether pygame was imported.
+_IMPORT_TIME = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, 'pygame' in sys.modules)
+"""
+
+
+def bench_startup(modules=STARTUP_MODULES, repeat: int = 5):
+    """ Import each module in a fresh interpreter, the way a tool or a worker process starts.
+
+    Returns
+    -------
+    rows : list of (module, seconds, pygame imported), best time of the repeats
+    """
+    rows = []
+    for module in modules:
+        timings = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', _IMPORT_TIME.format(module=module)], check=True,
+                                    capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            seconds, pygame_imported = output.stdout.split()[-2:]
+            timings.append(float(seconds))
+        rows.append((module, min(timings), pygame_imported == 'True'))
+    return rows
+
+
+def new_games(n_games: int, size: int, level: str, seed: int = None):
+    """ Return placed headless games, each in its own labyrinth. """
+    rng = random.Random(seed)
+    games = []
+    for _ in range(n_games):
+        player = Player('bench')
+        enemies = [Enemy(enemy_type=enemy_type) for enemy_type in LEVELS[level]]
+        game = Game(Labyrinth(size, rng=rng), player, enemies, rng=rng)
+        game.place_player()
+        game.place_enemies()
+        games.append(game)
+    return games
+
+
+def bench_batch(n_games: int, size: int, level: str, turns: int, seed: int = 0):
+    """ Play the same games with the NumPy batch simulator and one by one with Game.
+
+    Returns
+    -------
+    rows : list of (engine, games, turns, wins, seconds, games per second)
+    """
+    from batch import BatchSimulator, play_like_batch
+
+    games = new_games(n_games, size, level, seed)
+    scalar_games = copy.deepcopy(games)
+
+    stats = BatchSimulator(games, seed).run(turns)
+    rows = [('batch', n_games, stats['turns'], stats['wins'], stats['seconds'], stats['games_per_second'])]
+
+    start = time.perf_counter()
+    for g, game in enumerate(scalar_games):
+        play_like_batch(game, seed, g, turns)
+    seconds = time.perf_counter() - start
+    wins = sum(game.game_over and game.player.health > 0 for game in scalar_games)
+    rows.append(('game', n_games, stats['turns'], wins, seconds, n_games / seconds))
+    return rows
+
+
+def print_rows(header, rows):
+    """ Print the benchmark rows as an aligned table. """
+    widths = [max(len(_format(value)) for value in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print('  '.join(_format(value).rjust(width) for value, width in zip(row, widths)))
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f'{value:.4f}'
+    return str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Labyrinth performance benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    generators = subparsers.add_parser('generators', help='size vs time of each maze algorithm')
+    generators.add_argument('--sizes', type=int, nargs='+', default=[16, 64, 256, 512])
+    generators.add_argument('--repeat', type=int, default=1)
+
+    construction = subparsers.add_parser('construction', help='time and peak memory of each labyrinth stage')
+    construction.add_argument('--sizes', type=int, nargs='+', default=[4, 16, 64, 256])
+    construction.add_argument('--seed', type=int, default=0)
+    construction.add_argument('--no-memory', dest='memory', action='store_false',
+                              help='only time the stages, without tracing the memory')
+
+    chunked = subparsers.add_parser('chunked', help='memory of a random game in a chunked labyrinth')
+    chunked.add_argument('--size', type=int, default=32 * 1024)
+    chunked.add_argument('--turns', type=int, default=10000)
+    chunked.add_argument('--level', choices=list(LEVELS), default='easy')
+    chunked.add_argument('--seed', type=int, default=0)
+
+    hunters = subparsers.add_parser('hunters', help='turns per second against more and more hunters')
+    hunters.add_argument('--size', type=int, default=64)
+    hunters.add_argument('--hunters', type=int, nargs='+', default=[1, 10, 100])
+    hunters.add_argument('--turns', type=int, default=200)
+    hunters.add_argument('--seed', type=int, default=0)
+
+    solver = subparsers.add_parser('solver', help='labyrinths validated per minute, and the unsolvable ones')
+    solver.add_argument('--sizes', type=int, nargs='+', default=[8, 12, 32])
+    solver.add_argument('--seeds', type=int, default=1000)
+    solver.add_argument('--algorithm', choices=list(GENERATORS), default=MAZE_ALGORITHM)
+
+    startup = subparsers.add_parser('startup', help='import time of the modules in a fresh interpreter')
+    startup.add_argument('--modules', nargs='+', default=STARTUP_MODULES)
+    startup.add_argument('--repeat', type=int, default=5)
+
+    batch = subparsers.add_parser('batch', help='games per second of the batch simulator')
+    batch.add_argument('--games', type=int, default=1000)
+    batch.add_argument('--size', type=int, default=4)
+    batch.add_argument('--level', choices=list(LEVELS), default='youdead')
+    batch.add_argument('--turns', type=int, default=500)
+    batch.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.benchmark == 'generators':
+        print_rows(('algorithm', 'size', 'seconds'), bench_generators(args.sizes, args.repeat))
+    if args.benchmark == 'construction':
+        print_rows(('stage', 'size', 'seconds', 'peak MiB'), bench_construction(args.sizes, args.seed, args.memory))
+    if args.benchmark == 'chunked':
+        print_rows(('turns', 'chunks', 'generated', 'seconds', 'peak MiB'),
+                   bench_chunked(args.size, args.turns, args.level, args.seed))
+    if args.benchmark == 'hunters':
+        print_rows(('hunters', 'size', 'turns', 'seconds', 'turns/s'),
+                   bench_hunters(args.size, args.hunters, args.turns, args.seed))
+    if args.benchmark == 'solver':
+        print_rows(('size', 'labyrinths', 'failures', 'difficulty', 'seconds', 'labyrinths/min'),
+                   bench_solver(args.sizes, args.seeds, args.algorithm))
+    if args.benchmark == 'startup':
+        print_rows(('module', 'seconds', 'pygame'), bench_startup(args.modules, args.repeat))
+    if args.benchmark == 'batch':
+        print_rows(('engine', 'games', 'turns', 'wins', 'seconds', 'games/s'),
+                   bench_batch(args.games, args.size, args.level, args.turns, args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,6 @@
+from cfg import CONTENTS
+
+
 
 
 class Cell:
@@ -15,4 +18,30 @@ class Cell:
 		position
 		"""
 		self.content = content
-		self.position = position
\ No newline at end of file
+		self.position = position
+
+class ArrayCell:
+	"""
+	Cell of a labyrinth keeping the contents of its cells in an array,
+	one byte per cell: its content is read from and written to the array.
+	"""
+	def __init__(self, contents, index: int, position):
+		"""
+
+		Parameters
+		----------
+		contents : bytearray or memoryview, the index in CONTENTS of the content of each cell
+		index : index of the cell in contents
+		position
+		"""
+		self._contents = contents
+		self._index = index
+		self.position = position
+
+	@property
+	def content(self):
+		return CONTENTS[self._contents[self._index]]
+
+	@content.setter
+	def content(self, content: str):
+		self._contents[self._index] = CONTENTS.index(content)
@@ -1,7 +1,6 @@
 """
 This file contains all CONSTANTS of the game that are not considered to be changed
 """
-import pygame
 
 BLUE = (25, 180, 200)
 BLACK = (30, 30, 30)
@@ -10,6 +9,61 @@ PURPLE = (204, 0, 80)
 WHITE = (204, 204, 204)
 
 SPECIAL_CONTENT = ['river', 'exit', 'treasure', 'map', 'wormhole']
+CONTENTS = ['empty'] + SPECIAL_CONTENT
+
+# Enemy types of each difficulty level.
+LEVELS = {
+    'easy': [],
+    'medium': [1],
+    'hard': [4, 2, 1],
+    'youdead': [4, 4, 3, 2, 1]
+}
+
+# Player actions of a turn.
+ACTIONS = ['up', 'down', 'left', 'right', 'activate', 'skip']
+
+# Moves as (dx, dy); 'up' goes to the next row (y + 1).
+DIRECTIONS = {
+    'up': (0, 1),
+    'down': (0, -1),
+    'left': (-1, 0),
+    'right': (1, 0)
+}
+
+# Walls are stored as one byte per cell, one bit per closed side.
+WALL_BITS = {
+    (1, 0): 1,
+    (-1, 0): 2,
+    (0, 1): 4,
+    (0, -1): 8
+}
+ALL_WALLS = 15
+
+# Largest labyrinths played: in the terminal, seen through a viewport, and in a window, drawn whole.
+MAX_SIZE = 2000
+MAX_WINDOW_SIZE = 32
+
+# Default maze generation algorithm: backtracker, kruskal or wilson.
+MAZE_ALGORITHM = 'backtracker'
+# Search steps per cell of the river allowed to lay it, and largest labyrinth whose river is searched for.
+RIVER_STEPS = 4
+RIVER_SEARCH_SIZE = 16
+# Random cycles tried to lay the river of a larger labyrinth.
+RIVER_CYCLES = 4
+# Chunked labyrinth: side of the chunks in cells, chunks kept in memory and wormholes per chunk.
+CHUNK_SIZE = 32
+MAX_CHUNKS = 64
+CHUNK_WORMHOLES = 2
+# Greatest distance in steps at which the hunters find the player.
+HUNT_RADIUS = 32
+# Labyrinths of each size generated ahead for the next games.
+MAZE_POOL_DEPTH = 2
+# Frames per second while the enemies are animated, and time of an enemy step in milliseconds.
+FRAME_RATE = 30
+ENEMY_STEP_TIME = 100
+# Turns between two checks of the state of a recorded game.
+REPLAY_CHECKPOINT_TURNS = 32
+
 SOURCES = '../Sources/'
 IMG_PLAYER = SOURCES + 'player.png'
 IMG_ALIEN = SOURCES + 'alien.png'
@@ -21,14 +75,30 @@ IMG_TREASURE = SOURCES + 'treasure.png'
 IMG_RIVER = SOURCES + 'river.png'
 IMG_RIVER_START = SOURCES + 'river_start.png'
 IMG_EXIT = SOURCES + 'exit.png'
+IMAGES = [IMG_PLAYER, IMG_ALIEN, IMG_HORN, IMG_BEAR, IMG_HOLE, IMG_MAP, IMG_TREASURE, IMG_RIVER,
+          IMG_RIVER_START, IMG_EXIT]
+CONTENT_IMAGES = {
+    'exit': IMG_EXIT,
+    'treasure': IMG_TREASURE,
+    'map': IMG_MAP,
+    'wormhole': IMG_HOLE,
+    'river': IMG_RIVER
+}
+ENEMY_IMAGES = {
+    1: IMG_BEAR,
+    2: IMG_HORN,
+    3: IMG_ALIEN,
+    4: IMG_HORN
+}
 TITLE = 'Dark Labyrinth'
 
-KEY_MAP = {
-    'right': [pygame.K_d, pygame.K_RIGHT],
-    'left': [pygame.K_a, pygame.K_LEFT],
-    'down': [pygame.K_s, pygame.K_DOWN],
-    'up': [pygame.K_w, pygame.K_UP],
-    'activate': [pygame.K_e],
-    'skip': [pygame.K_p],
-    'quit': [pygame.K_ESCAPE]
+# Keys of each action by pygame key name, turned into key codes by pygame_renderer.key_map.
+KEYS = {
+    'right': ['d', 'right'],
+    'left': ['a', 'left'],
+    'down': ['s', 'down'],
+    'up': ['w', 'up'],
+    'activate': ['e'],
+    'skip': ['p'],
+    'quit': ['escape']
 }
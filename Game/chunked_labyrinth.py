@@ -0,0 +1,237 @@
+""" File containing the chunked labyrinth: a very large labyrinth generated region by region.
+
+The labyrinth is cut in square chunks of chunk_size cells, each generated the first
+time a walker or the renderer touches one of its cells. A chunk only depends on the
+seed and on its coordinates: the passages between two chunks are drawn from the
+seed and the coordinates of their common border, so both chunks agree on them, and
+an evicted chunk comes back identical. The contents set by the game (treasure picked
+up or dropped) are kept apart and replayed on the regenerated chunks.
+
+Only the max_chunks chunks used last are kept in memory.
+"""
+
+import random
+from collections import OrderedDict
+
+from cell import Cell
+from generators import carve
+from lazy_view import LazyView
+from cfg import *
+
+
+class Chunk:
+    """ The cells of a square region of the labyrinth, with their walls, exits and wormholes. """
+
+    def __init__(self, cells: list, walls: bytearray, exits: list, wormhole_next: dict):
+        """
+
+        Parameters
+        ----------
+        cells : cells of the chunk, row by row
+        walls : closed sides of the cells (see WALL_BITS)
+        exits : indexes in the labyrinth of the open neighbours of the cells
+        wormhole_next : index in the labyrinth of a wormhole -> index of the one it leads to
+        """
+        self.cells = cells
+        self.walls = walls
+        self.exits = exits
+        self.wormhole_next = wormhole_next
+
+
+class ChunkedLabyrinth:
+    """
+    Make a labyrinth generated chunk by chunk, usable by Game in place of Labyrinth.
+    It contains one treasure, one exit on the border and wormholes leading to one
+    another within each chunk, but no river and no map.
+    """
+
+    def __init__(self, size: int, seed=0, chunk_size: int = CHUNK_SIZE, max_chunks: int = MAX_CHUNKS,
+                 algorithm: str = MAZE_ALGORITHM, wall_p: float = .9):
+        """ Initialize a chunked labyrinth, no chunk is generated yet.
+
+        The size must be a multiple of chunk_size. Inside the chunks, the passages are carved
+        with the named algorithm, then every other wall is kept with probability wall_p.
+        """
+        if size % chunk_size:
+            raise ValueError(f'The size {size} is not a multiple of the chunk size {chunk_size}')
+        self.size = size
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.algorithm = algorithm
+        self.wall_p = wall_p
+
+        self.chunks = OrderedDict()
+        self.n_generated = 0
+        # Contents set by the game, replayed when their chunk is generated again.
+        self._changes = {}
+
+        self.cells = LazyView(self._cell, size ** 2)
+        self.exits = LazyView(self._exits, size ** 2)
+        self.wormhole_next = LazyView(self._wormhole_next, size ** 2)
+        self.river = []
+        self.river_index = {}
+        self.free = _StartCells(self)
+
+        # The exit is on the border, the treasure anywhere else.
+        rng = self._rng('objects')
+        last = size - 1
+        along = rng.randrange(size)
+        exit_index = self.index(rng.choice([(along, 0), (along, last), (0, along), (last, along)]))
+        treasure_index = exit_index
+        while treasure_index == exit_index:
+            treasure_index = rng.randrange(size ** 2)
+        self._objects = {exit_index: 'exit', treasure_index: 'treasure'}
+        self.contents = {'exit': {exit_index}, 'treasure': {treasure_index}}
+        self.exit = exit_index
+
+    @property
+    def exit_cell(self):
+        return self.cells[self.exit]
+
+    def _rng(self, *key):
+        """ Return a random generator only depending on the seed and the key. """
+        return random.Random('/'.join(str(part) for part in (self.seed,) + key))
+
+    def _locate(self, index: int):
+        """ Return the chunk of the cell index, generated if needed, and the index of the cell in the chunk. """
+        x, y = index % self.size, index // self.size
+        key = (x // self.chunk_size, y // self.chunk_size)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self._generate(*key)
+            self.chunks[key] = chunk
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk, (y % self.chunk_size) * self.chunk_size + x % self.chunk_size
+
+    def _cell(self, index: int):
+        chunk, local = self._locate(index)
+        return chunk.cells[local]
+
+    def _exits(self, index: int):
+        chunk, local = self._locate(index)
+        return chunk.exits[local]
+
+    def _wormhole_next(self, index: int):
+        return self._locate(index)[0].wormhole_next[index]
+
+    def _generate(self, cx: int, cy: int):
+        """ Generate the chunk at the chunk coordinates (cx, cy). """
+        size = self.chunk_size
+        rng = self._rng('chunk', cx, cy)
+        walls = bytearray([ALL_WALLS]) * (size ** 2)
+        carve(size, walls, self.algorithm, rng)
+
+        # Open some more walls inside the chunk, as Labyrinth._init_junctions.
+        for local in range(size ** 2):
+            x, y = local % size, local // size
+            for (dx, dy), neighbour in [((1, 0), local + 1), ((0, 1), local + size)]:
+                if x + dx < size and y + dy < size and walls[local] & WALL_BITS[dx, dy] \
+                        and rng.random() >= self.wall_p:
+                    walls[local] &= ~WALL_BITS[dx, dy]
+                    walls[neighbour] &= ~WALL_BITS[-dx, -dy]
+
+        # Open the passages through the borders shared with the other chunks.
+        n_chunks = self.size // size
+        for dx, dy in DIRECTIONS.values():
+            if not (0 <= cx + dx < n_chunks and 0 <= cy + dy < n_chunks):
+                continue
+            for along in self._border_passages(cx, cy, dx, dy):
+                x = {1: size - 1, -1: 0, 0: along}[dx]
+                y = {1: size - 1, -1: 0, 0: along}[dy]
+                walls[y * size + x] &= ~WALL_BITS[dx, dy]
+
+        left, top = cx * size, cy * size
+        cells = [Cell(position=(left + local % size, top + local // size)) for local in range(size ** 2)]
+        indexes = [self.index(cell.position) for cell in cells]
+        moves = [(WALL_BITS[direction], direction[0] + direction[1] * self.size) for direction in DIRECTIONS.values()]
+        exits = [[index + offset for bit, offset in moves if not cell_walls & bit]
+                 for index, cell_walls in zip(indexes, walls)]
+
+        for local, index in enumerate(indexes):
+            if index in self._objects:
+                cells[local].content = self._objects[index]
+
+        # Wormholes lead to one another within the chunk.
+        wormholes = []
+        while len(wormholes) < CHUNK_WORMHOLES:
+            local = rng.randrange(size ** 2)
+            if cells[local].content == 'empty':
+                cells[local].content = 'wormhole'
+                wormholes.append(indexes[local])
+        wormhole_next = dict(zip(wormholes, wormholes[1:] + wormholes[:1]))
+
+        for index, content in self._changes.items():
+            x, y = index % self.size, index // self.size
+            if left <= x < left + size and top <= y < top + size:
+                cells[(y - top) * size + x - left].content = content
+
+        self.n_generated += 1
+        return Chunk(cells, walls, exits, wormhole_next)
+
+    def _border_passages(self, cx: int, cy: int, dx: int, dy: int):
+        """ Return the places, along the border, of the passages from the chunk to its neighbour (dx, dy).
+
+        They are drawn from the seed and the border only, so both chunks find the same passages.
+        One passage at least keeps the labyrinth connected.
+        """
+        if dx:
+            rng = self._rng('vertical border', min(cx, cx + dx), cy)
+        else:
+            rng = self._rng('horizontal border', cx, min(cy, cy + dy))
+        passages = {rng.randrange(self.chunk_size)}
+        passages.update(along for along in range(self.chunk_size) if rng.random() >= self.wall_p)
+        return passages
+
+    def set_content(self, index: int, content: str):
+        """ Put the content in the cell of the index, updating the indexes of the contents. """
+        cell = self.cells[index]
+        if cell.content in self.contents:
+            self.contents[cell.content].discard(index)
+        if content in self.contents:
+            self.contents[content].add(index)
+        cell.content = content
+        self._changes[index] = content
+
+    def index(self, position):
+        """ Return the index of the position in the cells and the exits. """
+        x, y = position
+        return y * self.size + x
+
+    def is_inside(self, position):
+        """ Return True if the position belongs to the labyrinth, False otherwise. """
+        x, y = position
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def is_wall(self, position, direction):
+        """ Return True if the side of the cell in the given direction is closed. """
+        chunk, local = self._locate(self.index(position))
+        return bool(chunk.walls[local] & WALL_BITS[direction])
+
+
+class _StartCells:
+    """ The empty cells of the first chunk, where the walkers are placed (see FreeCells). """
+
+    def __init__(self, labyrinth: ChunkedLabyrinth):
+        self.labyrinth = labyrinth
+
+    def _empty_cells(self, exclude=()):
+        chunk = self.labyrinth._locate(0)[0]
+        return [self.labyrinth.index(cell.position) for cell in chunk.cells
+                if cell.content == 'empty' and self.labyrinth.index(cell.position) not in exclude]
+
+    def choice(self, rng):
+        """ Return a random empty cell of the first chunk. """
+        return rng.choice(self._empty_cells())
+
+    def sample(self, rng, k: int, exclude=()):
+        """ Return k distinct random empty cells of the first chunk, none of them in exclude. """
+        cells = self._empty_cells(exclude)
+        drawn = []
+        for _ in range(k):
+            drawn.append(rng.choice(cells))
+            cells.remove(drawn[-1])
+        return drawn
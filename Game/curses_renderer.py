@@ -0,0 +1,197 @@
+""" File containing the curses renderer: the labyrinth drawn in a terminal, for sessions without a display. """
+
+import curses
+from collections import deque
+from functools import cache
+
+from cfg import KEYS
+from occupancy import Occupancy
+from renderer import Renderer
+
+# Character of each content, of the walkers and of the walls.
+CONTENT_CHARS = {
+    'empty': ' ',
+    'exit': 'E',
+    'treasure': '$',
+    'map': 'M',
+    'wormhole': 'O',
+    'river': '~'
+}
+ENEMY_CHARS = {
+    1: 'B',
+    2: 'H',
+    3: 'A',
+    4: 'h'
+}
+PLAYER_CHAR = '@'
+# Color pairs.
+WALL, BORDER = 1, 2
+# Lines of the last messages, under the labyrinth.
+MESSAGE_LINES = 4
+
+
+@cache
+def key_map():
+    """ Return the curses key codes of each action (see KEYS). """
+    codes = {'escape': 27}
+    return {action: [ord(name) if len(name) == 1 else codes.get(name, getattr(curses, 'KEY_' + name.upper(), None))
+                     for name in names]
+            for action, names in KEYS.items()}
+
+
+class CursesRenderer(Renderer):
+    """
+    Draw the labyrinth in a curses window, the last messages under it.
+
+    A cell takes one character, and its walls take the characters around it.
+    Only the cells that changed are written again, and curses sends the
+    terminal only the characters that differ from the last frame. A labyrinth
+    larger than the window is seen through a viewport following the player,
+    so a frame never costs more than one screen.
+    """
+
+    def __init__(self, labyrinth, player, enemies, screen):
+        """
+
+        Parameters
+        ----------
+        labyrinth
+        player
+        enemies
+        screen : curses window, as given by curses.wrapper
+        """
+        self.labyrinth = labyrinth
+        self.player = player
+        self.enemies = enemies
+        self.screen = screen
+
+        # Cells to redraw, everything is drawn the first time.
+        self.dirty = set()
+        self.full_redraw = True
+        # First column and row of cells shown, and number of cells shown across and down.
+        self.origin = (0, 0)
+        self.view = (0, 0)
+        # Enemies of each cell, rebuilt on each full redraw.
+        self.occupants = Occupancy()
+        self.messages = deque(maxlen=MESSAGE_LINES)
+
+        curses.curs_set(0)
+        self.colors = {WALL: 0, BORDER: 0}
+        if curses.has_colors():
+            curses.start_color()
+            curses.init_pair(WALL, curses.COLOR_RED, curses.COLOR_BLACK)
+            curses.init_pair(BORDER, curses.COLOR_CYAN, curses.COLOR_BLACK)
+            self.colors = {WALL: curses.color_pair(WALL), BORDER: curses.color_pair(BORDER)}
+
+    def message(self, text: str):
+        self.messages.extend(line for line in text.splitlines() if line)
+
+    def draw(self):
+        """ Redraw the cells which changed since the last draw, the whole viewport if it moved. """
+        if self.full_redraw or self._player_near_edge():
+            self._draw_view()
+        else:
+            for index in self.dirty:
+                x, y = self.labyrinth.cells[index].position
+                if self._in_view(x, y):
+                    self._draw_cell(x, y)
+        self.dirty.clear()
+        self._write_messages()
+        self.screen.noutrefresh()
+        curses.doupdate()
+
+    def changed(self, *positions):
+        self.dirty.update(position for position in positions if position is not None)
+
+    def revealed(self, *positions):
+        self.dirty.update(positions)
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def enemy_moved(self, enemy, old_position):
+        self.occupants.move(enemy, old_position, enemy.position)
+
+    def _draw_view(self):
+        """ Center the viewport on the player and draw all of its cells. """
+        rows, columns = self.screen.getmaxyx()
+        # Two characters per cell and one for the last wall.
+        width = min(self.labyrinth.size, max(1, (columns - 2) // 2))
+        height = min(self.labyrinth.size, max(1, (rows - MESSAGE_LINES - 2) // 2))
+        x, y = self.labyrinth.cells[self.player.position].position
+        self.origin = (min(max(x - width // 2, 0), self.labyrinth.size - width),
+                       min(max(y - height // 2, 0), self.labyrinth.size - height))
+        self.view = (width, height)
+
+        self.occupants = Occupancy(self.enemies)
+        self.screen.erase()
+        for y in range(self.origin[1], self.origin[1] + height):
+            for x in range(self.origin[0], self.origin[0] + width):
+                self._draw_cell(x, y)
+        self.full_redraw = False
+
+    def _in_view(self, x: int, y: int):
+        """ Return True if the cell is inside the viewport. """
+        x0, y0 = self.origin
+        return x0 <= x < x0 + self.view[0] and y0 <= y < y0 + self.view[1]
+
+    def _player_near_edge(self):
+        """ Return True if the player left the viewport or came near one of its edges with cells beyond. """
+        position = self.labyrinth.cells[self.player.position].position
+        for coordinate, start, length in zip(position, self.origin, self.view):
+            margin = length // 4
+            if start > 0 and coordinate < start + margin:
+                return True
+            if start + length < self.labyrinth.size and coordinate >= start + length - margin:
+                return True
+        return False
+
+    def _draw_cell(self, x: int, y: int):
+        """ Write the cell, its walls and their corners, the fog hides them if undiscovered. """
+        row, column = 2 * (y - self.origin[1]) + 1, 2 * (x - self.origin[0]) + 1
+        visible = self._visible(x, y)
+        self._put(row, column, self._cell_char(x, y) if visible else ' ')
+
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            char, color = ' ', 0
+            if visible or self._visible(x + dx, y + dy):
+                if not self.labyrinth.is_inside((x + dx, y + dy)):
+                    char, color = '|' if dx else '-', self.colors[BORDER]
+                elif self.labyrinth.is_wall((x, y), (dx, dy)):
+                    char, color = '|' if dx else '-', self.colors[WALL]
+            self._put(row + dy, column + dx, char, color)
+
+        for dx in [-1, 1]:
+            for dy in [-1, 1]:
+                shown = any(self._visible(x + cx, y + cy) for cx in [0, dx] for cy in [0, dy])
+                self._put(row + dy, column + dx, '+' if shown else ' ')
+
+    def _visible(self, x: int, y: int):
+        """ Return True if the cell is inside the labyrinth and discovered. """
+        return self.labyrinth.is_inside((x, y)) and self.labyrinth.index((x, y)) in self.player.visited
+
+    def _cell_char(self, x: int, y: int):
+        """ Return the character of the player, else of an enemy, else of the content of the cell. """
+        index = self.labyrinth.index((x, y))
+        if index == self.player.position:
+            return PLAYER_CHAR
+        for enemy in self.occupants[index]:
+            return ENEMY_CHARS[enemy.enemy_type]
+        return CONTENT_CHARS[self.labyrinth.cells[index].content]
+
+    def _put(self, row: int, column: int, char: str, attributes: int = 0):
+        try:
+            self.screen.addch(row, column, char, attributes)
+        except curses.error:
+            # Out of the window, it was resized since the last full redraw.
+            pass
+
+    def _write_messages(self):
+        rows, columns = self.screen.getmaxyx()
+        top = max(0, rows - MESSAGE_LINES)
+        for i in range(min(MESSAGE_LINES, rows)):
+            text = self.messages[i] if i < len(self.messages) else ''
+            try:
+                self.screen.addnstr(top + i, 0, text.ljust(columns - 1), columns - 1)
+            except curses.error:
+                pass
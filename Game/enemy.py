@@ -3,7 +3,8 @@ from walker import Walker
 
 class Enemy(Walker):
     """
-    This class describes enemy (3 types exactly)
+    This class describes enemy (4 types exactly)
+    Hunters follow the way to the player (see FlowField), the others walk at random.
     """
 
     def __init__(self, position=None, enemy_type=1):
@@ -16,6 +17,7 @@ class Enemy(Walker):
         """
         super().__init__(position)
         self.enemy_type = enemy_type
+        self.hunts = False
         if self.enemy_type == 1:
             # Bear
             self.prin = 'Bear is roaring somewhere'
@@ -33,3 +35,14 @@ class Enemy(Walker):
             self.prin = 'IT IS THERE'
             self.damage = 2
             self.speed = 1
+
+        elif self.enemy_type == 4:
+            # Hunter, smells the player from afar
+            self.prin = 'Something is hunting you'
+            self.damage = 1
+            self.speed = 2
+            self.hunts = True
+
+    def __repr__(self):
+        # Stable across runs, for the event logs: the events hold the positions.
+        return f'Enemy(enemy_type={self.enemy_type})'
@@ -0,0 +1,118 @@
+""" File containing the game events and the bus carrying them from the game to its subscribers.
+
+The game publishes what happens during a turn as events, buffered until the end
+of the turn and then handed to every subscriber at once: the renderers, which
+turn them into messages (see describe), a logger, counters...
+Without subscribers the events are not even created.
+"""
+
+import logging
+from collections import Counter, namedtuple
+
+# The player entered a cell, holding the treasure or not.
+Moved = namedtuple('Moved', 'walker position content have_treasure')
+# The player walked into a wall or the border of the labyrinth.
+Blocked = namedtuple('Blocked', 'walker direction reason')
+# An enemy hit the player, who dropped the treasure if carried.
+Hit = namedtuple('Hit', 'walker damage health dropped')
+# The player activated the content of a cell: map, treasure or nothing.
+Activated = namedtuple('Activated', 'walker position content')
+# The player went through a wormhole.
+Teleported = namedtuple('Teleported', 'walker old_position position')
+# The river carried the player downstream, old_position == position at the end of the river.
+Drifted = namedtuple('Drifted', 'walker old_position position')
+# An enemy made itself heard at the end of its move.
+Heard = namedtuple('Heard', 'enemy')
+# The game is over, won or lost.
+GameOver = namedtuple('GameOver', 'won reason')
+# The rules were told.
+Rules = namedtuple('Rules', '')
+
+
+class EventBus:
+    """ Buffer of the events of a turn, flushed to the subscribers. """
+
+    def __init__(self):
+        self.subscribers = []
+        self.buffer = []
+
+    def __bool__(self):
+        """ True if the events are listened to. """
+        return bool(self.subscribers)
+
+    def subscribe(self, callback):
+        """ Call callback with the list of the events of each turn. """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def publish(self, event_type, *fields):
+        """ Buffer the event of the type and fields, created only if someone listens. """
+        if self.subscribers:
+            self.buffer.append(event_type(*fields))
+
+    def flush(self):
+        """ Hand the buffered events to the subscribers. """
+        if self.buffer:
+            events, self.buffer = self.buffer, []
+            for callback in self.subscribers:
+                callback(events)
+
+
+def describe(event):
+    """ Return the message telling the player about the event, None if there is nothing to tell. """
+    if isinstance(event, Moved):
+        if event.content == 'exit':
+            if event.have_treasure:
+                return f'{event.walker} is now in the exit room and can leave.'
+            return f'{event.walker} is now in the exit room but you need the treasure to leave.'
+        if event.content == 'empty':
+            return f'{event.walker} is now in an empty room.'
+        if event.content in ['wormhole', 'treasure', 'map']:
+            return f'{event.walker} is now in a room with {event.content}.'
+        return None
+    if isinstance(event, Blocked):
+        return event.reason
+    if isinstance(event, Hit):
+        if event.dropped:
+            return f'{event.walker} got hit, dropped the treasure, and now has {event.health}HP'
+        return f'{event.walker} got hit, and now has {event.health} HP'
+    if isinstance(event, Activated):
+        return {'map': 'You see an eye from HMM3 for whole map', 'treasure': 'You now carry the treasure',
+                'empty': 'Nothing happens'}.get(event.content)
+    if isinstance(event, Teleported):
+        return 'Are you playing Portal?'
+    if isinstance(event, Drifted):
+        if event.old_position == event.position:
+            return 'The strong current shakes you but you stay in place.'
+        return 'Woooo, So wet!'
+    if isinstance(event, Heard):
+        return event.enemy.prin
+    if isinstance(event, GameOver):
+        return event.reason
+    if isinstance(event, Rules):
+        return "Find Treasure! Then find exit.\n\nThis is a WASD game!\nUse 'e' to activate Cell\n"
+    return None
+
+
+class EventCounter:
+    """ Subscriber counting the events of each type. """
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def __call__(self, events):
+        self.counts.update(type(event).__name__ for event in events)
+
+
+class EventLogger:
+    """ Subscriber logging the events with the logging module, one record per turn. """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger('labyrinth')
+        self.level = level
+
+    def __call__(self, events):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, '%s', '; '.join(repr(event) for event in events))
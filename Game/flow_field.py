@@ -0,0 +1,48 @@
+""" File containing the flow field: the way to a target cell from every cell around it. """
+
+
+class FlowField:
+    """
+    Distances in steps from the cells to a target cell through the open passages,
+    found by a breadth-first search over the exits of a labyrinth. The search is
+    done once, then the next step of any walker towards the target is O(1).
+    """
+
+    def __init__(self, exits, target: int, radius: int = None):
+        """ Search the cells at most radius steps away from the target (all of them if radius is None).
+
+        Parameters
+        ----------
+        exits : table of the open neighbours of each cell (see Labyrinth.exits)
+        target : index of the cell the field leads to
+        radius : greatest distance searched
+        """
+        self.exits = exits
+        self.target = target
+        self.distance = {target: 0}
+        frontier = [target]
+        steps = 0
+        while frontier and (radius is None or steps < radius):
+            steps += 1
+            next_frontier = []
+            for index in frontier:
+                for neighbour in exits[index]:
+                    if neighbour not in self.distance:
+                        self.distance[neighbour] = steps
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+    def __contains__(self, index):
+        return index in self.distance
+
+    def step(self, index: int):
+        """ Return the first open neighbour (in the order of DIRECTIONS) one step closer to the target.
+
+        None if the cell is the target or out of the field.
+        """
+        distance = self.distance.get(index, 0) - 1
+        if distance < 0:
+            return None
+        for neighbour in self.exits[index]:
+            if self.distance.get(neighbour) == distance:
+                return neighbour
@@ -0,0 +1,27 @@
+""" File containing the fog of war: the cells of the labyrinth discovered by the player. """
+
+
+class Fog:
+    """
+    Set of the discovered cell indexes. Revealing and checking a cell are O(1),
+    and revealing the whole labyrinth (the map) does not list its cells.
+    """
+
+    def __init__(self):
+        self._revealed = set()
+        self.all_revealed = False
+
+    def __contains__(self, position):
+        return self.all_revealed or position in self._revealed
+
+    def __iter__(self):
+        """ Iterate over the positions revealed one by one, not over the whole labyrinth. """
+        return iter(self._revealed)
+
+    def reveal(self, position):
+        """ Lift the fog from the position. """
+        self._revealed.add(position)
+
+    def reveal_all(self):
+        """ Lift the fog from the whole labyrinth. """
+        self.all_revealed = True
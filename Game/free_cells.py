@@ -0,0 +1,57 @@
+""" File containing the pool of the free cells: the empty cells of the labyrinth. """
+
+# Under one free cell in SPARSE, the free cells are listed to draw one instead of drawn at random.
+SPARSE = 8
+
+
+class FreeCells:
+    """
+    Set of cell indexes supporting O(1) insertion, removal and random draws.
+    One byte per cell tells if it is in the pool. Most cells of a labyrinth are
+    free: a random draw tries random cells until it comes upon a free one.
+    """
+
+    def __init__(self, n_cells: int):
+        """ Make the pool of all the cells of a labyrinth of n_cells cells. """
+        self._free = bytearray([1]) * n_cells
+        self._length = n_cells
+
+    def __contains__(self, index):
+        return bool(self._free[index])
+
+    def __len__(self):
+        return self._length
+
+    def add(self, index: int):
+        """ Put the cell back in the pool. """
+        if not self._free[index]:
+            self._free[index] = 1
+            self._length += 1
+
+    def discard(self, index: int):
+        """ Take the cell out of the pool if it is in. """
+        if self._free[index]:
+            self._free[index] = 0
+            self._length -= 1
+
+    def choice(self, rng):
+        """ Return a random free cell, drawn with rng.randrange, or rng.choice if few cells are free. """
+        if self._length * SPARSE < len(self._free):
+            return rng.choice([index for index, free in enumerate(self._free) if free])
+        while True:
+            index = rng.randrange(len(self._free))
+            if self._free[index]:
+                return index
+
+    def sample(self, rng, k: int, exclude=()):
+        """ Return k distinct random free cells, none of them in exclude. """
+        removed = [index for index in exclude if index in self]
+        for index in removed:
+            self.discard(index)
+        drawn = []
+        for _ in range(k):
+            drawn.append(self.choice(rng))
+            self.discard(drawn[-1])
+        for index in drawn + removed:
+            self.add(index)
+        return drawn
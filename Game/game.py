@@ -1,90 +1,162 @@
 """ File containing the game object. """
 
-from random import choice, sample
+import random
+from collections import deque
 
 from labyrinth import Labyrinth
 from player import Player
 from walker import Walker
-from cfg import SPECIAL_CONTENT
+from cfg import DIRECTIONS, HUNT_RADIUS
 from enemy import Enemy
-import time
+from events import Activated, Blocked, Drifted, EventBus, GameOver, Heard, Hit, Moved, Rules, Teleported
+from flow_field import FlowField
+from occupancy import Occupancy
+from renderer import Renderer
+
 
 class Game:
-    def __init__(self, labyrinth: Labyrinth, player: Player, enemies: list):
-        """ Init game with parameters"""
+    def __init__(self, labyrinth: Labyrinth, player: Player, enemies: list, renderer: Renderer = None,
+                 rng=None, seed=None):
+        """ Init game with parameters
+
+        Without a renderer the game runs headless: nothing is drawn or printed.
+        rng draws the placements and the random moves (a random.Random(seed) by default).
+        What happens is published on the event bus, flushed at the end of each turn.
+        """
         self.game_over = False
         self.player = player
         self.enemies = enemies
         self.labyrinth = labyrinth
+        self.renderer = renderer if renderer is not None else Renderer()
+        self.events = EventBus()
+        if renderer is not None:
+            self.events.subscribe(renderer.notify)
+        self.rng = rng if rng is not None else random.Random(seed)
+        # None if the game cannot be played again from its seed.
+        self.seed = seed if rng is None else None
+        # Walkers of each cell, updated by move_walker.
+        self.occupancy = Occupancy([player] + enemies)
+        # Way to the player for the hunters, searched once per turn.
+        self.flow = None
 
     def display_rules(self):
         """ Display the labyrinth game's rules. """
-        print("Find Treasure! Then find exit.")
-        print("\nThis is a WASD game!")
-        print("Use 'e' to activate Cell\n")
+        self.events.publish(Rules)
+        self.events.flush()
+
+    def play_turn(self, action: str):
+        """ Resolve a turn: the player action, then the river and the enemies.
+
+        Parameters
+        ----------
+        action : one of the DIRECTIONS, 'activate' or 'skip'
+
+        Returns
+        -------
+        played : bool, False if the action did not take a turn
+        """
+        if action in DIRECTIONS:
+            move_possible, reason = self.is_move_possible(self.player, action)
+            if move_possible:
+                self.move_player(action)
+                self.renderer.draw()
+            else:
+                self.events.publish(Blocked, self.player, action, reason)
+
+        if action == 'activate':
+            if not self.activate_cell():
+                self.events.flush()
+                return False
+            self.renderer.draw()
+
+        if self.labyrinth.cells[self.player.position].content == 'river':
+            self.river_move_player(self.player)
+            self.renderer.draw()
+
+        if any(enemy.hunts for enemy in self.enemies):
+            self.flow = FlowField(self.labyrinth.exits, self.player.position, HUNT_RADIUS)
+        for enemy in self.enemies:
+            self.move_enemy(enemy)
+
+        self.game_over, reason = self.is_game_over()
+        if self.game_over:
+            self.events.publish(GameOver, self.player.health > 0, reason)
+        self.events.flush()
+        return True
 
     def place_player(self):
         """ Place player if the cell is empty"""
-        possible_positions = [pos for pos, cell in self.labyrinth.cells.items()
-                              if cell.content not in SPECIAL_CONTENT]
-
-        self.player.move(choice(possible_positions))
+        self.move_walker(self.player, self.labyrinth.free.choice(self.rng))
 
     def place_enemies(self):
         """ Place the enemies of the cells are empty"""
-        possible_positions = [position for position, cell in self.labyrinth.cells.items()
-                              if cell.content not in SPECIAL_CONTENT and position != self.player.position]
-
-        positions = sample(possible_positions, k=len(self.enemies))
+        positions = self.labyrinth.free.sample(self.rng, len(self.enemies), exclude=[self.player.position])
 
         for i, position in enumerate(positions):
-            self.enemies[i].position = position
+            self.move_walker(self.enemies[i], position)
+
+    def move_walker(self, walker: Walker, position: int):
+        """ Put the walker in the cell of the index and tell the renderer which cells changed. """
+        old_position = walker.position
+        if isinstance(walker, Player):
+            if position not in walker.visited:
+                self.renderer.revealed(position)
+            walker.move(position)
+        else:
+            walker.position = position
+        self.occupancy.move(walker, old_position, position)
+        self.renderer.changed(old_position, position)
 
     def is_move_possible(self, walker: Walker, direction: str):
         """ Check if the move is possible"""
 
-        if direction == 'up': x_move, y_move = 0, 1
-        if direction == 'down': x_move, y_move = 0, -1
-        if direction == 'left': x_move, y_move = -1, 0
-        if direction == 'right': x_move, y_move = 1, 0
-        x, y = walker.position
+        x_move, y_move = DIRECTIONS[direction]
+        if walker.position + x_move + y_move * self.labyrinth.size in self.labyrinth.exits[walker.position]:
+            return True, ''
 
-        if (x + x_move, y + y_move) in self.labyrinth.cells.keys():
-            if self.labyrinth.junctions[(self.labyrinth.cells[x, y],
-                                         self.labyrinth.cells[x + x_move, y + y_move])] != 'wall':
-                return True, ''
+        x, y = self.labyrinth.cells[walker.position].position
+        if self.labyrinth.is_inside((x + x_move, y + y_move)):
             return False, 'WALL - are you blind?'
         return False, 'MONOLITH - are you blind?'
 
     def move_player(self, direction: str):
         """ Move the Player and notify what is inside the room"""
-        if direction == 'up': x_move, y_move = 0, 1
-        if direction == 'down': x_move, y_move = 0, -1
-        if direction == 'left': x_move, y_move = -1, 0
-        if direction == 'right': x_move, y_move = 1, 0
+        x_move, y_move = DIRECTIONS[direction]
 
-        x, y = self.player.position
-        self.player.move((x + x_move, y + y_move))
+        self.move_walker(self.player, self.player.position + x_move + y_move * self.labyrinth.size)
         content = self.labyrinth.cells[self.player.position].content
-
-        if content == 'empty': print(f'{self.player} is now in an empty room.')
-        if content == 'wormhole': print(f'{self.player} is now in a room with wormhole.')
-        if content == 'treasure': print(f'{self.player} is now in a room with treasure.')
-        if content == 'map': print(f'{self.player} is now in a room with map.')
-        if content == 'exit':
-            if self.player.have_treasure:
-                print(f'{self.player} is now in the exit room and can leave.')
-            else:
-                print(f'{self.player} is now in the exit room but you need the treasure to leave.')
+        self.events.publish(Moved, self.player, self.player.position, content, self.player.have_treasure)
 
     def player_hit(self, damage):
         """ Getting hit and notify the HP of the Player"""
         self.player.health -= damage
-        if not self.player.have_treasure:
-            print(f'{self.player} got hit, and now has {self.player.health} HP')
-        else:
-            self.labyrinth.cells[self.player.position].content = 'treasure'
-            print(f'{self.player} got hit, dropped the treasure, and now has {self.player.health}HP')
+        dropped = False
+        if self.player.have_treasure:
+            position = self.drop_position(self.player.position)
+            if position is not None:
+                self.labyrinth.set_content(position, 'treasure')
+                self.player.have_treasure = False
+                self.renderer.changed(position)
+                dropped = True
+        self.events.publish(Hit, self.player, damage, self.player.health, dropped)
+
+    def drop_position(self, position: int):
+        """ Return the empty cell nearest to the position, where a dropped treasure falls, None if there is none.
+
+        The treasure never covers the exit, the river, a wormhole or the map: the cells
+        are searched breadth-first through the open sides, in the order of DIRECTIONS.
+        """
+        seen = {position}
+        queue = deque([position])
+        while queue:
+            index = queue.popleft()
+            if self.labyrinth.cells[index].content == 'empty':
+                return index
+            for neighbour in self.labyrinth.exits[index]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return None
 
     def activate_cell(self):
         """ Execute the cell action.
@@ -92,92 +164,72 @@ class Game:
         If the cell contains treasure - pick it up.
         """
         content = self.labyrinth.cells[self.player.position].content
-        position = self.labyrinth.cells[self.player.position].position
+        if content in ['map', 'treasure', 'empty']:
+            self.events.publish(Activated, self.player, self.player.position, content)
 
         if content == 'map':
-            print('You see an eye from HMM3 for whole map')
-            for x in range(self.labyrinth.size):
-                for y in range(self.labyrinth.size):
-                    self.player.visited.append((x,y))
+            self.player.visited.reveal_all()
 
-            self.labyrinth.cells[self.player.position].content = 'empty'
-            self.labyrinth.display_labyrinth()
+            self.labyrinth.set_content(self.player.position, 'empty')
+            self.renderer.invalidate()
+            self.renderer.draw()
 
         if content == 'wormhole':
-            for i in range(len(self.labyrinth.wormholes)):
-                if self.labyrinth.wormholes[i] == self.labyrinth.cells[position]:
-                    new_position = self.labyrinth.wormholes[(i + 1) % len(self.labyrinth.wormholes)].position
-                    self.player.move(new_position)
+            old_position = self.player.position
+            self.move_walker(self.player, self.labyrinth.wormhole_next[self.player.position])
 
-                    print('Are you playing Portal?')
-                    return True
+            self.events.publish(Teleported, self.player, old_position, self.player.position)
+            return True
 
         if content == 'treasure':
             self.player.have_treasure = True
-            self.labyrinth.cells[self.player.position].content = 'empty'
-            print('You now carry the treasure')
+            self.labyrinth.set_content(self.player.position, 'empty')
+            self.renderer.changed(self.player.position)
             return True
 
         if content == 'empty':
-            print('Nothing happens')
             return False
 
     def move_enemy(self, enemy: Enemy):
-        """ Randomly move enemy and refresh the display """
-        steps = 0
-        while steps < enemy.speed:
-            # enemy can move several times
-            direction = choice([(0, 1), (0, -1), (-1, 0), (1, 0)])
-
-            x, y = enemy.position
-            if (x + direction[0], y + direction[1]) in self.labyrinth.cells.keys():
-                if self.labyrinth.junctions[(self.labyrinth.cells[x, y],
-                                             self.labyrinth.cells[x + direction[0],
-                                                                  y + direction[1]])] != 'wall':
-                    enemy.position = x + direction[0], y + direction[1]
-                    if (x, y) in self.player.visited:
-                        time.sleep(0.1)
-                        self.labyrinth.display_labyrinth()
-                    steps += 1
+        """ Move enemy, towards the player if it hunts and finds the player, else randomly, and refresh the display """
+        for _ in range(enemy.speed):
+            # enemy can move several times, each time through an open side of its cell
+            old_position = enemy.position
+            position = self.flow.step(enemy.position) if enemy.hunts and self.flow is not None else None
+            if position is None:
+                position = self.rng.choice(self.labyrinth.exits[enemy.position])
+            self.move_walker(enemy, position)
+            self.renderer.enemy_moved(enemy, old_position)
 
             # hit player if the same position
-            if self.player.position == enemy.position:
-                # hit player
+            if self.player in self.occupancy[enemy.position]:
+                # hit player and push the player through an open side
                 self.player_hit(enemy.damage)
-                while True:
-                    direction = choice(['up', 'down', 'left', 'right'])
-                    if self.is_move_possible(self.player, direction):
-                        break
-                self.move_player(direction)
-        print(enemy.prin)
+                self.move_player(self.rng.choice([direction for direction in DIRECTIONS
+                                                  if self.is_move_possible(self.player, direction)[0]]))
+        self.events.publish(Heard, enemy)
 
     def river_move_player(self, walker):
         """ Move player down the river """
-        idx = 0
         # Count how far from the end of the river
-        for cell in self.labyrinth.river:
-            if cell == self.labyrinth.cells[walker.position]:
-                break
-            idx += 1
+        idx = self.labyrinth.river_index[walker.position]
 
         # if it is in the end (or almost) of the river - so don`t move the player
         if idx == len(self.labyrinth.river) - 1:
             if isinstance(walker, Enemy):
                 return 0
-            print('The strong current shakes you but you stay in place.')
+            self.events.publish(Drifted, walker, walker.position, walker.position)
             return 0
 
         # move player down for 2 cells
+        old_position = walker.position
         for i in range(2):
             if idx < len(self.labyrinth.river) - 1:
-                if(isinstance(walker, Player)):
-                    walker.move(self.labyrinth.river[(idx)].position)
-                    walker.move(self.labyrinth.river[(idx + 1)].position)
-                walker.position = self.labyrinth.river[(idx + 1)].position
+                self.move_walker(walker, self.labyrinth.index(self.labyrinth.river[(idx + 1)].position))
                 idx += 1
         if isinstance(walker, Enemy):
             return 0
-        print('Woooo, So wet!')
+        self.events.publish(Drifted, walker, old_position, walker.position)
 
     def is_game_over(self):
         """
@@ -189,7 +241,7 @@ class Game:
         Reason : str
         """
         # Check if a player has escaped with the treasure and describes it if so.
-        if self.player.position == self.labyrinth.exit_cell.position and self.player.have_treasure:
+        if self.player.position == self.labyrinth.exit and self.player.have_treasure:
             reason = f'{self.player} escapes with the treasure and wins!'
             return True, reason
         if self.player.health <= 0:
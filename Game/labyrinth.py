@@ -1,231 +1,358 @@
 """ File containing the labyrinth object. """
 
-from random import random, choice, sample
-
-from cell import Cell
+import math
+import random
+from array import array
+
+from cell import ArrayCell, Cell
+from free_cells import FreeCells
+from generators import carve
+from lazy_view import LazyView
+from river_index import RiverIndex
 from cfg import *
-from player import Player
-
-import pygame
 
 
 class Labyrinth:
     """ Make a labyrinth."""
-    cells: dict
+    cells: list
 
-    def __init__(self, player: Player, enemies, size: int, scale: int, n_enemies: int):
+    def __init__(self, size: int, algorithm: str = MAZE_ALGORITHM, rng=None, seed=None):
         """ Initialize a labyrinth.
         
         Make a square labyrinth of the specified size containing one treasure and one exit.
         The parameter options must be a dictionary if specified.
+        The passages are carved with the named algorithm (see generators.GENERATORS).
+        Every random draw comes from rng, a random.Random(seed) by default: the same
+        seed always makes the same labyrinth.
         """
-        self.player = player
-        self.enemies = enemies
-
-        # Display
         self.size = size
-        self.scale = scale
-        pygame.DOUBLEBU = True
-
-        # Objects
-        self.n_enemies = n_enemies
+        self.algorithm = algorithm
+        # None if the labyrinth cannot be made again from its seed.
+        self.seed = seed if rng is None else None
+        self.rng = rng if rng is not None else random.Random(seed)
         self.wormholes = []
         self._init_cells()
         self.river = self._init_river()
-        self.junctions = self._init_junctions(.9)
+        self.walls = self._init_junctions(.9)
+        self.exits = self._init_exits()
         self._init_objects()
 
-        self._init_display()
-
-    def _init_display(self):
-        self.img_scale = int(self.scale * 0.95)
-        self.distance = int(self.scale * 1.2)
-        self.padding = int(self.scale * 1.8)
-        self.shift = self.padding // 2 + self.scale // 2
-        self.lab_size = self.padding + self.distance * (self.size - 1) + 2 * self.scale
-        self.display_width = self.lab_size
-        self.display_height = self.lab_size
-
-        self.wall_shift = int((self.distance + self.scale) / 2)
-
-        pygame.font.init()
-        self.screen = pygame.display.set_mode((self.display_width, self.display_height))  # set application dimensions
-        pygame.display.set_caption(TITLE)
-        self.screen.fill(BLACK)  # set application background color
-
-        # TEXT
-        self.right_font = pygame.font.SysFont('Comic Sans MS', int(self.scale / 1.2))
-        self.left_font = pygame.font.SysFont('Comic Sans MS', int(self.scale / 1.6))
-
-        pygame.display.flip()
-
     def _init_cells(self):
-        # Create all cells as empty.
-        self.cells = {(x, y): Cell(position=(x, y)) for x in range(self.size)
-                      for y in range(self.size)}
+        # All cells are empty: the index in CONTENTS of the content of each cell, one byte per cell.
+        # The cell of (x, y) is at index y * size + x, made when it is asked for.
+        self._contents = bytearray(self.size ** 2)
+        self.cells = LazyView(self._cell, self.size ** 2)
+        # Indexes of the cells holding each special content, kept up to date by set_content.
+        # The cells of the river are indexed by river_index.
+        self.contents = {content: set() for content in SPECIAL_CONTENT if content != 'river'}
+        # Empty cells, to place the objects and the walkers.
+        self.free = FreeCells(self.size ** 2)
 
     def _init_river(self):
+        """ Lay a river from an edge cell, through the inner cells, back to an edge.
+
+        A new cell of the river never touches it except at the head. Up to RIVER_SEARCH_SIZE
+        the river is searched for (see _search_river), larger ones rarely succeed. Otherwise
+        it follows a random cycle through the labyrinth (see _tree_river), and if no cycle
+        fits in RIVER_CYCLES tries, winds back and forth (see _serpentine_river).
+        """
         river_size_min = ((self.size - 1) ** 2 // 4) - 1
         river_size_max = self.size ** 2 // 4
-        river_sizes = list(range(river_size_min - 1, river_size_max + 1))
-        possible_source_cells = [cell for cell in self.cells.values()
-                                 if self._is_edge_cell(cell)]
-        river = [choice(possible_source_cells)]
-        while True:
-            if len(river) in river_sizes:
-                cell_can_be_edge = True
-            else:
-                cell_can_be_edge = False
-
-            cell = self._choose_next_river_cell(river, cell_can_be_edge=cell_can_be_edge)
+        # Lengths of the river before its last cell, on the edge.
+        river_sizes = range(river_size_min - 1, river_size_max + 1)
+
+        river = None
+        if self.size <= RIVER_SEARCH_SIZE:
+            river = self._search_river(river_sizes)
+        # A cycle can miss the allowed lengths, a few are tried.
+        tries = RIVER_CYCLES
+        while river is None and tries:
+            river = self._tree_river(river_sizes)
+            tries -= 1
+        if river is None:
+            last = self.size - 1
+            source = self.rng.choice([(x, y) for x in range(1, last) for y in [0, last]]
+                                     + [(x, y) for y in range(1, last) for x in [0, last]])
+            river = self._serpentine_river(source, self.rng.choice(river_sizes) + 1)
+
+        # Place in the river of each of its cells.
+        self._river = array('I', river)
+        self.river_index = RiverIndex(self._river, self.size ** 2)
+        for index in self._river:
+            self.set_content(index, 'river')
+        return LazyView(self._river_cell, len(self._river))
+
+    def _search_river(self, river_sizes: range):
+        """ Return the cell indexes of a river grown by a depth-first search, None if not found in time.
+
+        The search runs over the neighbours of the head of the river, dead ends are
+        backtracked, and it is bounded to RIVER_STEPS steps per cell of the longest river.
+        """
+        # A corner has no inner neighbour to flow to.
+        possible_source_cells = [cell for cell in self.cells
+                                 if self._is_edge_cell(cell) and not self._is_corner_cell(cell)]
+        source = self.rng.choice(possible_source_cells).position
+
+        river = [source]
+        in_river = {source}
+        candidates = [self._next_river_cells(river, in_river)]
+        steps = RIVER_STEPS * river_sizes[-1]
+        while candidates and steps:
+            steps -= 1
+            if not candidates[-1] or len(river) > river_sizes[-1]:
+                # Dead end: step back to the previous head.
+                candidates.pop()
+                in_river.remove(river.pop())
+                continue
 
-            if cell == None or len(river) > river_size_max:
-                river = [river[0]]
+            position = candidates[-1].pop()
+            if self._is_edge_cell(self.cells[self.index(position)]):
+                # The river can only reach the edge again once long enough.
+                if len(river) in river_sizes:
+                    river.append(position)
+                    return [self.index(position) for position in river]
                 continue
-            river.append(cell)
-            if cell_can_be_edge and self._is_edge_cell(cell):
-                break
+            river.append(position)
+            in_river.add(position)
+            candidates.append(self._next_river_cells(river, in_river))
+        return None
 
-        for c in river:
-            self.cells[c.position].content = 'river'
-        return river
+    def _tree_river(self, river_sizes: range):
+        """ Return the cell indexes of a river following a random cycle, None if the labyrinth is too small.
 
-    def _init_junctions(self, wall_p: float):
+        The nodes are the cells of odd coordinates, grouped in blocks of 2 x 2. The
+        contour of a spanning tree of the blocks, carved with the maze algorithm, is a
+        cycle through every node. The river follows the cycle from a node next to an
+        edge to another one, through the cells between the nodes, then runs straight
+        to the edges. A node only touches the cells linking it to the nodes before and
+        after it, so the river never touches itself.
+        """
+        blocks = (self.size - 1) // 4
+        if blocks == 0:
+            return None
+        tree = bytearray([ALL_WALLS]) * blocks ** 2
+        carve(blocks, tree, self.algorithm, self.rng)
+
+        # Walk the cycle, the node (i, j) being j * n + i: each node has a neighbour through the
+        # side of its block above or under it, and one through the side left or right of it.
+        # The neighbour is out of the block if the tree opens the side, else the next node along
+        # the side. The offsets of both neighbours only depend on the corner of the block the
+        # node is in and on the walls of the block.
+        n = 2 * blocks
+        offsets = []
+        for corner in range(4):
+            dx, dy = (1 if corner & 1 else -1), (1 if corner & 2 else -1)
+            offsets += [(dy * n if not walls & WALL_BITS[0, dy] else -dx,
+                         dx if not walls & WALL_BITS[dx, 0] else -dy * n) for walls in range(ALL_WALLS + 1)]
+        cycle = array('I', [0])
+        previous, node = -1, 0
+        while True:
+            j, i = divmod(node, n)
+            vertical, horizontal = offsets[((j & 1) << 1 | i & 1) << 4 | tree[j // 2 * blocks + i // 2]]
+            previous, node = node, node + (horizontal if node + vertical == previous else vertical)
+            if node == 0:
+                break
+            cycle.append(node)
+
+        # Nodes next to an edge, by place in the cycle, with the cells from the node to the edge.
+        size, last = self.size, self.size - 1
+        next_to_edge = bytearray(n ** 2)
+        for along in range(n):
+            next_to_edge[along] = next_to_edge[along * n] = next_to_edge[along * n + n - 1] = 1
+            next_to_edge[(n - 1) * n + along] = 1
+        ends = []
+        for k in (k for k, node in enumerate(cycle) if next_to_edge[node]):
+            j, i = divmod(cycle[k], n)
+            x, y = 2 * i + 1, 2 * j + 1
+            if i == 0: ends.append((k, [y * size]))
+            if j == 0: ends.append((k, [x]))
+            if i == n - 1: ends.append((k, [y * size + x for x in range(x + 1, last + 1)]))
+            if j == n - 1: ends.append((k, [y * size + x for y in range(y + 1, last + 1)]))
+
+        # The river from the node k to the node k + steps has 2 * steps + 1 cells and the cells
+        # to the edges, the first edge cell excluded from the length checked (see river_sizes).
+        for k, source in self.rng.sample(ends, k=len(ends)):
+            mouths = []
+            for k_mouth, mouth in ends:
+                steps = (k_mouth - k) % len(cycle)
+                if steps and len(source) + 2 * steps + len(mouth) in river_sizes:
+                    mouths.append((steps, mouth))
+            if mouths:
+                steps, mouth = self.rng.choice(mouths)
+                river = array('I', source[::-1])
+                node = cycle[k]
+                for step in range(steps + 1):
+                    previous, node = node, cycle[(k + step) % len(cycle)]
+                    j, i = divmod(node, n)
+                    if step:
+                        j0, i0 = divmod(previous, n)
+                        river.append((j + j0 + 1) * size + i + i0 + 1)
+                    river.append((2 * j + 1) * size + 2 * i + 1)
+                river.extend(mouth)
+                return river
+        return None
 
-        junctions = {(c1, c2): 'nothing' for c1 in self.cells.values()
-                     for c2 in self.cells.values()
-                     if c1 != c2}
-        junctions_to_del = []
-        for c1, c2 in junctions.keys():
-            x1, y1 = c1.position
-            x2, y2 = c2.position
-
-            if abs(x2 - x1) + abs(y2 - y1) == 1:
-                if random() < wall_p and c1 not in self.river and c2 not in self.river:
-                    junctions[c1, c2] = 'wall'
-                    junctions[c2, c1] = junctions[c1, c2]
-            else:
-                junctions_to_del.append((c1, c2))
-
-        for c1, c2 in junctions_to_del: del junctions[c1, c2]
-
-        visited = []
-        stack = []
-        x = 0
-        y = 0
-        stack.append((x, y))  # place starting cell into stack
-        visited.append((x, y))  # add starting cell to visited list
-        while len(stack) > 0:  # loop until stack is empty
-            cell = []  # define cell list
-
-            if (x + 1, y) not in visited and (x + 1, y) in self.cells.keys():  # right cell available?
-                cell.append("right")  # if yes add to cell list
-
-            if (x - 1, y) not in visited and (x - 1, y) in self.cells.keys():  # left cell available?
-                cell.append("left")
-
-            if (x, y + 1) not in visited and (x, y + 1) in self.cells.keys():  # down cell available?
-                cell.append("down")
-
-            if (x, y - 1) not in visited and (x, y - 1) in self.cells.keys():  # up cell available?
-                cell.append("up")
-
-            if len(cell) > 0:  # check to see if cell list is empty
-                cell_chosen = (choice(cell))  # select one of the cell randomly
-                x_ = x
-                y_ = y
-                if cell_chosen == "right":  # if this cell has been chosen
-                    x_ = x + 1  # make this cell the current cell
-                elif cell_chosen == "left":
-                    x_ = x - 1
-                elif cell_chosen == "down":
-                    y_ = y + 1
-                elif cell_chosen == "up":
-                    y_ = y - 1
-
-                junctions[self.cells[(x, y)], self.cells[(x_, y_)]] = 'nothing'
-                junctions[self.cells[(x_, y_)], self.cells[(x, y)]] = junctions[self.cells[(x, y)],
-                                                                                self.cells[(x_, y_)]]
-                x = x_
-                y = y_
-                visited.append((x, y))  # add to visited list
-                stack.append((x, y))  # place current cell on to stack
+    def _serpentine_river(self, source, length: int):
+        """ Return the cell indexes of a river winding back and forth from the edge cell source.
 
+        Rows of the river are two cells apart so that it never touches itself. Once the
+        river is long enough to reach the length, it flows straight to the opposite edge.
+        """
+        last = self.size - 1
+        x, y = source
+        # u runs along the edge of the source, v away from it.
+        if y == 0:
+            u, position = x, lambda u, v: (u, v)
+        elif y == last:
+            u, position = x, lambda u, v: (u, last - v)
+        elif x == 0:
+            u, position = y, lambda u, v: (v, u)
+        else:
+            u, position = y, lambda u, v: (last - v, u)
+
+        v, step = 0, 1
+        river = [position(u, v)]
+        while v < last:
+            if len(river) + last - v >= length or v % 2 == 0:
+                v += 1
+            elif 0 < u + step < last:
+                u += step
             else:
-                x, y = stack.pop()  # if no cells are available pop one from the stack
+                # Turn into the next row.
+                step = -step
+                v += 1
+            river.append(position(u, v))
+        return [self.index(position) for position in river]
 
-        return junctions
+    def _init_junctions(self, wall_p: float):
+        """ Build the wall grid: one byte per cell holding its closed sides (see WALL_BITS).
+
+        Borders are always closed. The passages of a spanning tree are carved with
+        the chosen algorithm, then every other inner wall is kept with probability
+        wall_p, except around the river which is never walled in.
+        """
+        n_cells = self.size ** 2
+        walls = bytearray([ALL_WALLS]) * n_cells
+        carve(self.size, walls, self.algorithm, self.rng)
+
+        # The sides right of and under the cells, 2 * index and 2 * index + 1, each opened
+        # with probability 1 - wall_p: the gaps between the sides opened are geometric.
+        right, left, down, up = (WALL_BITS[direction] for direction in [(1, 0), (-1, 0), (0, 1), (0, -1)])
+        side = -1
+        while wall_p < 1:
+            side += 1 + (int(math.log(1 - self.rng.random()) / math.log(wall_p)) if wall_p > 0 else 0)
+            if side >= 2 * n_cells:
+                break
+            index = side >> 1
+            if side & 1 and index + self.size < n_cells:
+                walls[index] &= ~down
+                walls[index + self.size] &= ~up
+            elif not side & 1 and (index + 1) % self.size:
+                walls[index] &= ~right
+                walls[index + 1] &= ~left
+
+        # Open the sides touching the river at once, on the whole grid taken as an integer of one
+        # byte per cell: the lowest bit of each byte of a mask tells if the cell matches it.
+        in_river = int.from_bytes(self._contents.translate(bytes(content == 'river' for content in CONTENTS)
+                                                           + bytes(256 - len(CONTENTS))), 'little')
+        cells = int.from_bytes(bytes([1]) * n_cells, 'little')
+        not_last_column = int.from_bytes((bytes([1]) * (self.size - 1) + bytes(1)) * self.size, 'little')
+        right_open = (in_river | in_river >> 8) & not_last_column
+        down_open = (in_river | in_river >> 8 * self.size) & cells >> 8 * self.size
+        closed = int.from_bytes(walls, 'little') & ~(right_open * right | (right_open << 8) * left
+                                                     | down_open * down | (down_open << 8 * self.size) * up)
+        return bytearray(closed.to_bytes(n_cells, 'little'))
+
+    def _init_exits(self):
+        """ Return the table of the moves: for each cell index, the indexes of its open neighbours.
+
+        The neighbours are listed in the order of DIRECTIONS. They are read from the
+        byte of walls of the cell when they are asked for, nothing is stored per cell.
+        """
+        moves = [(WALL_BITS[direction], direction[0] + direction[1] * self.size) for direction in DIRECTIONS.values()]
+        # Index offsets of the open neighbours, for each byte of walls.
+        self._exit_offsets = [[offset for bit, offset in moves if not walls & bit] for walls in range(ALL_WALLS + 1)]
+        return LazyView(self._exits, self.size ** 2)
 
     def _init_objects(self):
 
         # Set the exit cell..
-        exit_position = choice([position for position, cell in self.cells.items()
-                                if self._is_edge_cell(cell) and
-                                cell.content not in SPECIAL_CONTENT])
-        self.cells[exit_position].content = 'exit'
-        self.exit_cell = self.cells[exit_position]
+        last = self.size - 1
+        edge_positions = [(x, y) for x in range(self.size) for y in [0, last]]
+        edge_positions += [(x, y) for y in range(1, last) for x in [0, last]]
+        exit_index = self.rng.choice([self.index(position) for position in edge_positions
+                                      if self.index(position) in self.free])
+        self.set_content(exit_index, 'exit')
+        # Index of the exit, fixed whatever the content of its cell.
+        self.exit = exit_index
+        self.exit_cell = self.cells[exit_index]
 
         # Set the treasure in a cell.
-        treasure_position = choice([position for position, cell in self.cells.items()
-                                    if cell.content not in SPECIAL_CONTENT])
-        self.cells[treasure_position].content = 'treasure'
-        self.treasure_cell = self.cells[treasure_position]
+        treasure_index = self.free.choice(self.rng)
+        self.set_content(treasure_index, 'treasure')
+        self.treasure_cell = self.cells[treasure_index]
 
         # Set the map cell.
-        map_position = choice([position for position, cell in self.cells.items()
-                               if cell.content not in SPECIAL_CONTENT])
-        self.cells[map_position].content = 'map'
+        self.set_content(self.free.choice(self.rng), 'map')
 
         # Set wormholes.
         n_wormholes = self.size // 2
+        wormholes = []
         for i in range(n_wormholes):
-            content = 'exit'
-            while content in SPECIAL_CONTENT:
-                position = choice(list(self.cells.keys()))
-                content = self.cells[position].content
-            self.cells[position].content = 'wormhole'
-            self.wormholes.append(self.cells[position])
-
-    def _choose_next_river_cell(self, river: list, cell_can_be_edge=True):
-
-        c0 = river[-1]
-        adjacent_c0 = []
-
-        # Get a list of adjacent cells (with or without edge cells).
-        if cell_can_be_edge:
-            for cell in self.cells.values():
-                if self._are_adjacent_cells(cell, c0): adjacent_c0.append(cell)
-        else:
-            for cell in self.cells.values():
-                if self._are_adjacent_cells(cell, c0) and not self._is_edge_cell(cell):
-                    adjacent_c0.append(cell)
+            wormholes.append(self.free.choice(self.rng))
+            self.set_content(wormholes[-1], 'wormhole')
+            self.wormholes.append(self.cells[wormholes[-1]])
+
+        # Each wormhole leads to the next one, the last one to the first.
+        self.wormhole_next = dict(zip(wormholes, wormholes[1:] + wormholes[:1]))
+
+    def _next_river_cells(self, river: list, in_river: set):
+        """ Return, in random order, the cells which can follow the head of the river.
+
+        A cell can follow if none of its neighbours but the head is in the river.
+        """
+        x0, y0 = river[-1]
+        next_cells = []
+        for x1, y1 in [(x0 + 1, y0), (x0 - 1, y0), (x0, y0 + 1), (x0, y0 - 1)]:
+            if not self.is_inside((x1, y1)) or (x1, y1) in in_river:
+                continue
+            if any(neighbour in in_river and neighbour != (x0, y0)
+                   for neighbour in [(x1 + 1, y1), (x1 - 1, y1), (x1, y1 + 1), (x1, y1 - 1)]):
+                continue
+            next_cells.append((x1, y1))
 
         # Randomize the order of the list.
-        adjacent_c0 = sample(adjacent_c0, k=len(adjacent_c0))
+        return self.rng.sample(next_cells, k=len(next_cells))
+
+    def set_content(self, index: int, content: str):
+        """ Put the content in the cell of the index, updating the indexes of the contents. """
+        old_content = CONTENTS[self._contents[index]]
+        if old_content in self.contents:
+            self.contents[old_content].discard(index)
+        if content in self.contents:
+            self.contents[content].add(index)
+        if content == 'empty':
+            self.free.add(index)
+        else:
+            self.free.discard(index)
+        self._contents[index] = CONTENTS.index(content)
 
-        # Ensure that the adjacent cells are not part of the river.
-        for c1 in adjacent_c0:
+    def _cell(self, index: int):
+        return ArrayCell(self._contents, index, (index % self.size, index // self.size))
 
-            adjacent_c1 = []
-            for cell in self.cells.values():
-                if self._are_adjacent_cells(cell, c1): adjacent_c1.append(cell)
+    def _exits(self, index: int):
+        return [index + offset for offset in self._exit_offsets[self.walls[index]]]
 
-            are_river = [cell in river for cell in adjacent_c1
-                         if cell != c0]
-            if True in are_river:
-                continue
-            return c1
-        return None
+    def _river_cell(self, i: int):
+        return self.cells[self._river[i]]
 
     def _get_exit_cell(self):
 
-        for cell in self.cells.values():
-            if cell.content == 'exit': return cell
+        for index in self.contents['exit']: return self.cells[index]
 
     def _get_treasure_cell(self):
 
-        for cell in self.cells.values():
-            if cell.content == 'treasure': return cell
+        for index in self.contents['treasure']: return self.cells[index]
 
     def _is_edge_cell(self, cell: Cell):
         """ Return True if the cell is on the edge of the labyrinth, False otherwise. """
@@ -239,174 +366,16 @@ class Labyrinth:
         if x in [0, self.size - 1] and y in [0, self.size - 1]: return True
         return False
 
-    def _are_adjacent_cells(self, c1: Cell, c2: Cell):
-        """ Return True if c2 is above, under, left, or right of c1, False otherwise. """
-        x1, y1 = c1.position
-        x2, y2 = c2.position
+    def index(self, position):
+        """ Return the index of the position in the cells, the walls and the exits. """
+        x, y = position
+        return y * self.size + x
 
-        if abs(x2 - x1) + abs(y2 - y1) == 1:
-            return True
-        return False
+    def is_inside(self, position):
+        """ Return True if the position belongs to the labyrinth, False otherwise. """
+        x, y = position
+        return 0 <= x < self.size and 0 <= y < self.size
 
-    def display_labyrinth(self):
-        """ Display the labyrinth in the terminal. """
-
-        rect = [self.shift, self.shift, self.lab_size, self.lab_size]
-        pygame.draw.rect(self.screen, BLACK, rect, 0)
-        pygame.display.flip()
-
-        for x in range(self.size):
-            for y in range(self.size):
-                # define the coordinates of the considered cell
-                point_x = x * self.distance + self.shift
-                point_y = y * self.distance + self.shift
-                if (x, y) in self.player.visited:
-                    # if player was there (the tuman of was is implemented there exactly)
-                    rect = [point_x, point_y, self.scale, self.scale]
-                    pygame.draw.rect(self.screen, WHITE, rect, 1) # draw CELL
-
-                    icon_path = None
-
-                    content = self.cells[x, y].content
-                    # draw content
-                    if content != 'empty':
-                        if content == 'exit': icon_path = IMG_EXIT
-                        if content == 'treasure': icon_path = IMG_TREASURE
-                        if content == 'map': icon_path = IMG_MAP
-                        if content == 'wormhole': icon_path = IMG_HOLE
-                        if content == 'river':
-                            if self.cells[x, y] == self.river[0]:
-                                icon_path = IMG_RIVER_START
-                            else:
-                                icon_path = IMG_RIVER
-                        icon = pygame.image.load(icon_path).convert_alpha()
-                        icon = pygame.transform.scale(icon, (self.img_scale, self.img_scale))
-                        self.screen.blit(icon, [point_x, point_y])
-
-                    for enemy in self.enemies:
-                        if enemy.position == (x, y):
-                            if enemy.enemy_type == 1:
-                                icon_path = IMG_BEAR
-                            elif enemy.enemy_type == 2:
-                                icon_path = IMG_HORN
-                            elif enemy.enemy_type == 3:
-                                icon_path = IMG_ALIEN
-
-                            icon = pygame.image.load(icon_path).convert_alpha()
-                            icon = pygame.transform.scale(icon, (self.img_scale, self.img_scale))
-                            self.screen.blit(icon, [point_x, point_y])
-
-                if self.player.position == (x, y):
-                    icon_path = IMG_PLAYER
-                    icon = pygame.image.load(icon_path).convert_alpha()
-                    icon = pygame.transform.scale(icon, (self.img_scale, self.img_scale))
-                    self.screen.blit(icon, [point_x, point_y])
-        #
-
-        start_points = []
-        end_points = []
-
-        for c1, c2 in self.junctions.keys():
-
-            if self.junctions[c1, c2] == self.junctions[c2, c1] == 'wall':
-                x1, y1 = c1.position
-                x2, y2 = c2.position
-
-                if (x1, y1) in self.player.visited or (x2, y2) in self.player.visited:
-
-                    if x1 - x2 != 0:
-                        start_point_x = max(x1, x2) * self.distance + int(self.shift * 0.92)
-                        start_point_y = y1 * self.distance + self.shift
-                        end_point_x = start_point_x
-                        end_point_y = start_point_y + self.scale
-
-                    if y1 - y2 != 0:
-                        start_point_x = x1 * self.distance + self.shift
-                        start_point_y = max(y1, y2) * self.distance + int(self.shift * 0.92)
-                        end_point_x = start_point_x + self.scale
-                        end_point_y = start_point_y
-
-                    start_points.append((start_point_x, start_point_y))
-                    end_points.append((end_point_x, end_point_y))
-
-        for start_point, end_point in zip(start_points, end_points):
-            pygame.draw.line(self.screen, RED, start_point, end_point, 5)
-
-        start_points = []
-        end_points = []
-
-        for cell in self.cells.values():
-            (x, y) = cell.position
-            if (x, y) in self.player.visited:
-                if x == 0:
-                    start_point_x = int(self.shift * 0.92)
-                    start_point_y = y * self.distance + self.shift
-                    end_point_x = start_point_x
-                    end_point_y = start_point_y + self.scale
-
-                    start_points.append((start_point_x, start_point_y))
-                    end_points.append((end_point_x, end_point_y))
-
-                if x == self.size - 1:
-                    start_point_x = (x + 1) * self.distance + int(self.shift * 0.92)
-                    start_point_y = y * self.distance + self.shift
-                    end_point_x = start_point_x
-                    end_point_y = start_point_y + self.scale
-
-                    start_points.append((start_point_x, start_point_y))
-                    end_points.append((end_point_x, end_point_y))
-
-                if y == 0:
-                    start_point_x = x * self.distance + self.shift
-                    start_point_y = int(self.shift * 0.92)
-                    end_point_x = start_point_x + self.scale
-                    end_point_y = start_point_y
-
-                    start_points.append((start_point_x, start_point_y))
-                    end_points.append((end_point_x, end_point_y))
-
-                if y == self.size - 1:
-                    start_point_x = x * self.distance + self.shift
-                    start_point_y = (y + 1) * self.distance + int(self.shift * 0.92)
-                    end_point_x = start_point_x + self.scale
-                    end_point_y = start_point_y
-
-                    start_points.append((start_point_x, start_point_y))
-                    end_points.append((end_point_x, end_point_y))
-
-        for start_point, end_point in zip(start_points, end_points):
-            pygame.draw.line(self.screen, (0, 100, 148), start_point, end_point, 5)
-
-        pygame.display.flip()
-
-    # def display_log(self):
-    #     """
-    #     Log Text display
-    #
-    #     Returns
-    #     -------
-    #
-    #     """
-    #     cli_texts = ['Hey there I only want to talk withyou!', 'YOU HAVE DONE THAT DEAR!', '3']
-    #     text_cli_texts = [self.left_font.render(f'{cli_text}', True, (25, 180, 200)) for cli_text in cli_texts]
-    #     for i, text_cli_text in enumerate(text_cli_texts):
-    #         self.screen.blit(text_cli_text,
-    #                          (int(self.padding / 2), int(self.scale * i * 0.8) + self.lab_size * 0.9))  # draw text
-    #     pygame.display.flip()
-    #
-    # def display_attributes(self):
-    #     """
-    #     Display attributes
-    #
-    #     Returns
-    #     -------
-    #
-    #     """
-    #     text_health_value = 0
-    #     text_turn_value = 0
-    #
-    #     text_health = self.right_font.render(f'Health: {str(text_health_value)}', True, (25, 180, 200))
-    #     text_turn = self.right_font.render(f'Turn: {str(text_turn_value)}', True, (25, 180, 200))
-    #     self.screen.blit(text_health, (self.lab_size, self.padding))  # draw text
-    #     self.screen.blit(text_turn, (self.lab_size, self.padding + self.scale))  # draw text
-    #     pygame.display.flip()
\ No newline at end of file
+    def is_wall(self, position, direction):
+        """ Return True if the side of the cell in the given direction is closed. """
+        return bool(self.walls[self.index(position)] & WALL_BITS[direction])
@@ -0,0 +1,18 @@
+""" File containing the lazy view: a sequence computing its items when they are asked for. """
+
+
+class LazyView:
+    """ Read-only sequence of a value of each cell, computed from the cell index. """
+
+    def __init__(self, get, length: int):
+        self._get = get
+        self._length = length
+
+    def __getitem__(self, index):
+        return self._get(index)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return map(self._get, range(self._length))
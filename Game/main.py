@@ -1,81 +1,149 @@
 """ File containing the main function and running the game. """
 
-from labyrinth import Labyrinth
+import argparse
+import os
+import secrets
+import time
+
+import profiling
+from maze_pool import MazePool
+from replay import Recorder
 from player import Player
 from game import Game
 from enemy import Enemy
-from cfg import KEY_MAP
-import pygame
+from cfg import FRAME_RATE, LEVELS, MAX_SIZE, MAX_WINDOW_SIZE, MAZE_POOL_DEPTH, TITLE
 
 
-def play_game_labyrinth():
+def play_game_labyrinth(maze_pool: MazePool, terminal: bool = False, record_directory: str = None):
     """
     Main function to play the game
+    The labyrinth comes from the maze pool, generated while the previous game was played.
+    The game is drawn in the terminal with curses if terminal is True, else in a pygame window.
+    With a record_directory, the game is recorded there to be replayed (see replay.py).
     """
     player = get_player()
     enemies = get_enemies()
-    size = get_labyrinth_size()
-    scale = get_scale()
-    game = Game(Labyrinth(player, enemies, size, scale, len(enemies)), player, enemies)
-    game.place_player()
-    game.place_enemies()
-    game.display_rules()
-    game.labyrinth.display_labyrinth()
-
-
-    while not game.game_over:
-
-        player_moved = False
-        while not player_moved:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.display.quit()
-
-                if event.type == pygame.KEYDOWN:
-                    if event.key in KEY_MAP['quit']:
-                        pygame.display.quit()
-
-                    if event.key in KEY_MAP['right']:
-                        direction = 'right'
-                        do_move(game, player, direction)
-
-                    if event.key in KEY_MAP['left']:
-                        direction = 'left'
-                        do_move(game, player, direction)
-
-                    if event.key in KEY_MAP['down']:
-                        direction = 'up'
-                        do_move(game, player, direction)
-
-                    if event.key in KEY_MAP['up']:
-                        direction = 'down'
-                        do_move(game, player, direction)
+    size = get_labyrinth_size(MAX_SIZE if terminal else MAX_WINDOW_SIZE)
+    maze_pool.prepare(size)
+    record_path = get_record_path(record_directory) if record_directory is not None else None
+    if terminal:
+        import curses
+        curses.wrapper(run_terminal_game, maze_pool.get(size), player, enemies, record_path)
+    else:
+        from pygame_renderer import PygameRenderer
 
-                    if event.key in KEY_MAP['skip']:
-                        game.skip()
-                        player_moved = True
+        scale = get_scale()
+        labyrinth = maze_pool.get(size)
+        game = Game(labyrinth, player, enemies, PygameRenderer(labyrinth, player, enemies, scale),
+                    seed=secrets.randbits(64))
+        game.place_player()
+        game.place_enemies()
+        game.display_rules()
+        game.renderer.draw()
 
-                    player_moved = True
-                    if event.key in KEY_MAP['activate']:
-                        player_moved = game.activate_cell()
-                        if player_moved:
-                            game.labyrinth.display_labyrinth()
+        run_game(game, record_path)
+    if record_path is not None:
+        print(f'Game recorded in {record_path}')
 
-        if game.labyrinth.cells[game.player.position].content == 'river':
-            game.river_move_player(player)
-            game.labyrinth.display_labyrinth()
+    # game.labyrinth.display_labyrinth()
+    # game.labyrinth.display_legend()
 
-        for enemy in enemies:
-            game.move_enemy(enemy)
 
-        game.game_over, reason = game.is_game_over()
+def run_game(game: Game, record_path: str = None):
+    """
+    Play a turn on each key press until the game is over or the window is closed
+    Between the turns the loop sleeps in pygame.event.wait, the clock only ticks
+    at FRAME_RATE while the steps of the enemies are animated.
+    The actions are recorded in record_path if given, even if the window is closed.
+    """
+    import pygame
+    from pygame_renderer import key_map
+
+    clock = pygame.time.Clock()
+    keys = key_map()
+    recorder = Recorder(game) if record_path is not None else None
+    try:
+        while not game.game_over:
+            if game.renderer.animate():
+                clock.tick(FRAME_RATE)
+                events = pygame.event.get()
+            else:
+                events = [pygame.event.wait()]
+
+            for event in events:
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key in keys['quit']):
+                    pygame.display.quit()
+                    return
 
-        if game.game_over:
-            print(reason)
-            break
+                if event.type == pygame.KEYDOWN:
+                    with profiling.timer('key to frame'):
+                        # A key press does not wait for the enemies of the previous turn.
+                        game.renderer.skip_animation()
+                        action = get_action(event.key, keys)
+                        game.play_turn(action)
+                        # The cells changed at the end of the turn: steps not animated, the end of the game.
+                        game.renderer.draw()
+                    if recorder is not None:
+                        recorder.record(action)
+                    if game.game_over:
+                        break
+    finally:
+        if recorder is not None:
+            recorder.save(record_path)
+
+
+def run_terminal_game(screen, labyrinth, player, enemies, record_path: str = None):
+    """
+    Play in the terminal, a turn on each key press, until the game is over or the player quits
+    Once over, the end of the game stays on the screen until a key is pressed.
+    The actions are recorded in record_path if given, even if the player quits.
+    """
+    import curses
+    from curses_renderer import CursesRenderer, key_map
 
-    # game.labyrinth.display_labyrinth()
-    # game.labyrinth.display_legend()
+    game = Game(labyrinth, player, enemies, CursesRenderer(labyrinth, player, enemies, screen),
+                seed=secrets.randbits(64))
+    game.place_player()
+    game.place_enemies()
+    game.display_rules()
+    game.renderer.draw()
+
+    keys = key_map()
+    recorder = Recorder(game) if record_path is not None else None
+    try:
+        while not game.game_over:
+            key = screen.getch()
+            if key in keys['quit']:
+                return
+            with profiling.timer('key to frame'):
+                if key == curses.KEY_RESIZE:
+                    game.renderer.invalidate()
+                else:
+                    action = get_action(key, keys)
+                    game.play_turn(action)
+                    if recorder is not None:
+                        recorder.record(action)
+                game.renderer.draw()
+        screen.getch()
+    finally:
+        if recorder is not None:
+            recorder.save(record_path)
+
+
+def get_action(key, keys: dict):
+    """
+    Get the action of a key, the labyrinth being drawn with 'up' (y + 1) at the bottom
+    Returns
+    -------
+    action : str, 'skip' for the keys of no action
+    """
+    action = 'skip'
+    if key in keys['right']: action = 'right'
+    if key in keys['left']: action = 'left'
+    if key in keys['down']: action = 'up'
+    if key in keys['up']: action = 'down'
+    if key in keys['activate']: action = 'activate'
+    return action
 
 
 def get_player():
@@ -99,32 +167,49 @@ def get_enemies():
     enemies : list
     """
     level = ''
-    enemies = []
-    while level not in ['easy', 'medium', 'hard', 'youdead']:
+    while level not in LEVELS:
         level = input('Enter difficulty: youdead, hard, medium, easy: ')
-    if level == 'medium':
-        enemies.extend([Enemy(enemy_type=1)])
-    if level == 'hard':
-        enemies.extend([Enemy(enemy_type=2), Enemy(enemy_type=1)])
-    if level == 'youdead':
-        enemies.extend([Enemy(enemy_type=3), Enemy(enemy_type=2), Enemy(enemy_type=1)])
-    return enemies
+    return [Enemy(enemy_type=enemy_type) for enemy_type in LEVELS[level]]
 
 
-def get_labyrinth_size():
+def get_labyrinth_size(maximum: int = MAX_WINDOW_SIZE):
     """
     Get size of the Labyrinth in console
+    Size must be (4-maximum)
+
     Returns
     -------
     size : int
     """
     size = 0
-    while size not in [str(i) for i in range(4, 13)]:
-        size = input('Enter the desired size of labyrinth (must be comprised between 4 and 12): ')
+    while size not in [str(i) for i in range(4, maximum + 1)]:
+        size = input(f'Enter the desired size of labyrinth (must be comprised between 4 and {maximum}): ')
 
     return int(size)
 
 
+def get_record_path(record_directory: str):
+    """
+    Make the directory of the recordings if needed and reserve a new file in it
+    The file is named after the time, with a counter if a game was recorded in the same second.
+
+    Returns
+    -------
+    record_path : str
+    """
+    os.makedirs(record_directory, exist_ok=True)
+    name = time.strftime('%Y%m%d-%H%M%S')
+    counter = 0
+    while True:
+        record_path = os.path.join(record_directory, f'{name}-{counter}.rec' if counter else f'{name}.rec')
+        try:
+            # Created only if it does not exist yet, even by another process.
+            with open(record_path, 'x'):
+                return record_path
+        except FileExistsError:
+            counter += 1
+
+
 def get_scale():
     """
     Get scale in console
@@ -141,31 +226,29 @@ def get_scale():
     return int(scale)
 
 
-def do_move(game, player, direction):
-    """
-    This function is to move player from one cell to another
-    Parameters
-    ----------
-    game
-    player
-    direction
-
-    Returns
-    -------
-    """
-    move_possible, reason = game.is_move_possible(player, direction)
-    if move_possible:
-        game.move_player(direction)
-        game.labyrinth.display_labyrinth()
-    else:
-        print(reason)
-
-
 if __name__ == '__main__':
 
-    new_game = True
-    while new_game:
-
-        play_game_labyrinth()
-        answer = input('\nDo you want to play another game? [y/n] ').strip().lower()
-        if answer not in ['y', 'yes']: new_game = False
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument('--terminal', action='store_true', help='play in the terminal, without a window')
+    parser.add_argument('--record', metavar='DIRECTORY', help='record the games to replay them (see replay.py)')
+    parser.add_argument('--profile', action='store_true', help='print where the time went at the end')
+    parser.add_argument('--profile-json', metavar='PATH', help='write where the time went in a JSON file')
+    args = parser.parse_args()
+    if not args.terminal:
+        # Imported before profiling starts for the window to be profiled, never in the terminal.
+        import pygame_renderer
+    profile = profiling.enable() if args.profile or args.profile_json else None
+
+    # The labyrinths are built in this process when profiled, to time their stages.
+    with MazePool(depth=0 if profile else MAZE_POOL_DEPTH) as maze_pool:
+        new_game = True
+        while new_game:
+
+            play_game_labyrinth(maze_pool, args.terminal, args.record)
+            answer = input('\nDo you want to play another game? [y/n] ').strip().lower()
+            if answer not in ['y', 'yes']: new_game = False
+
+    if args.profile:
+        print(profile.summary())
+    if args.profile_json:
+        profile.dump_json(args.profile_json)
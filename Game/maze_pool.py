@@ -0,0 +1,70 @@
+""" File containing the maze pool: labyrinths generated in the background, ready to be played. """
+
+import secrets
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from cfg import MAZE_ALGORITHM, MAZE_POOL_DEPTH
+from labyrinth import Labyrinth
+
+
+def _generate(size: int, algorithm: str):
+    # Run in the worker processes, every labyrinth gets its own random seed, kept to replay the games.
+    return Labyrinth(size, algorithm, seed=secrets.randbits(64))
+
+
+class MazePool:
+    """
+    Labyrinths generated ahead by a pool of processes. Once a size is asked for,
+    depth labyrinths of this size are kept generated or in generation, so the
+    next games of the same size start without waiting.
+    """
+
+    def __init__(self, sizes=(), depth: int = MAZE_POOL_DEPTH, algorithm: str = MAZE_ALGORITHM, workers=None):
+        """
+
+        Parameters
+        ----------
+        sizes : sizes to generate from the start
+        depth : number of labyrinths kept ahead for each size
+        algorithm : maze generation algorithm (see generators.GENERATORS)
+        workers : number of processes, the number of CPUs by default
+        """
+        self.depth = depth
+        self.algorithm = algorithm
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        # Labyrinths in generation or generated, oldest first, for each size.
+        self.pending = {}
+        for size in sizes:
+            self.prepare(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def prepare(self, size: int):
+        """ Generate labyrinths of the size in the background, up to the depth of the pool. """
+        pending = self.pending.setdefault(size, deque())
+        while len(pending) < self.depth:
+            pending.append(self.executor.submit(_generate, size, self.algorithm))
+
+    def get(self, size: int):
+        """ Return a labyrinth of the size, a generated one if any, and refill the pool.
+
+        Without any labyrinth of this size in generation, it is generated right away.
+        """
+        pending = self.pending.get(size)
+        if pending:
+            future = next((future for future in pending if future.done()), pending[0])
+            pending.remove(future)
+            labyrinth = future.result()
+        else:
+            labyrinth = _generate(size, self.algorithm)
+        self.prepare(size)
+        return labyrinth
+
+    def close(self):
+        """ Stop the processes, dropping the labyrinths not handed out. """
+        self.executor.shutdown(wait=False, cancel_futures=True)
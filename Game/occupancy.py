@@ -0,0 +1,36 @@
+""" File containing the occupancy index: the walkers standing in each cell. """
+
+
+class Occupancy:
+    """
+    Walkers of each cell, kept up to date as they move. Finding the walkers of
+    a cell is O(1), whatever the number of walkers in the labyrinth.
+    """
+
+    def __init__(self, walkers=()):
+        """ Index the walkers already placed (the position of the others is None). """
+        self._walkers = {}
+        for walker in walkers:
+            self.add(walker, walker.position)
+
+    def __getitem__(self, index):
+        """ Return the walkers in the cell of the index. """
+        return self._walkers.get(index, ())
+
+    def add(self, walker, index):
+        """ Put the walker in the cell, nothing happens if index is None. """
+        if index is not None:
+            self._walkers.setdefault(index, []).append(walker)
+
+    def remove(self, walker, index):
+        """ Take the walker out of the cell, nothing happens if index is None. """
+        if index is not None:
+            walkers = self._walkers[index]
+            walkers.remove(walker)
+            if not walkers:
+                del self._walkers[index]
+
+    def move(self, walker, old_index, new_index):
+        """ Move the walker from a cell to another. """
+        self.remove(walker, old_index)
+        self.add(walker, new_index)
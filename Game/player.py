@@ -1,10 +1,13 @@
 """ File containing the player object. """
 
+from collections import deque
+
+from fog import Fog
 from walker import Walker
 
 
 class Player(Walker):
-    def __init__(self, name: str, position=None, health=5, have_treasure=False):
+    def __init__(self, name: str, position=None, health=5, have_treasure=False, history_size=0):
         """
 
         Parameters
@@ -13,16 +16,24 @@ class Player(Walker):
         position
         health
         have_treasure
+        history_size : number of last positions kept in history, no history if 0
         """
         super().__init__(position)
         self.name = name
         self.health = health
         self.have_treasure = have_treasure
-        self.visited = []
+        self.visited = Fog()
+        self.history = deque(maxlen=history_size) if history_size else None
 
     def __str__(self):
         return self.name
 
+    def __repr__(self):
+        # Stable across runs, for the event logs: the events hold the positions.
+        return f'Player({self.name!r})'
+
     def move(self, new_position):
         self.position = new_position
-        self.visited.append(new_position)
+        self.visited.reveal(new_position)
+        if self.history is not None:
+            self.history.append(new_position)
@@ -0,0 +1,192 @@
+""" File containing the profiler: timers and counters on the hot paths of the game.
+
+Nothing is measured until enable() is called: it replaces the instrumented methods
+of the classes by timed wrappers, and disable() puts the originals back, so the
+game runs its own code at full speed when it is not profiled.
+
+Timers:
+    Labyrinth.__init__ and its stages (_init_cells, _init_river, ...)
+    Game.play_turn: the turn logic, the frame drawn at the end of the turn excluded
+    key to frame: from the key handled to the frame drawn (input to frame latency),
+        timed by the game loops of main.py (see timer)
+    Game.move_enemy
+    PygameRenderer.display_labyrinth (full frame) and PygameRenderer.draw
+Counters:
+    enemy steps, wall rejections (moves of the player into a wall or the border),
+    blits (the surfaces drawn on the window by PygameRenderer: layers and sprites),
+    and the blits per frame, a frame being a call of PygameRenderer.draw
+
+Only the current process is profiled, not the workers of a MazePool. The display
+is only profiled if its modules are imported when profiling starts, enable() does
+not import pygame.
+"""
+
+import importlib
+import json
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from cfg import DIRECTIONS
+
+# (module, class, method) of the timed functions.
+TIMED = [
+    ('labyrinth', 'Labyrinth', '__init__'),
+    ('labyrinth', 'Labyrinth', '_init_cells'),
+    ('labyrinth', 'Labyrinth', '_init_river'),
+    ('labyrinth', 'Labyrinth', '_init_junctions'),
+    ('labyrinth', 'Labyrinth', '_init_exits'),
+    ('labyrinth', 'Labyrinth', '_init_objects'),
+    ('game', 'Game', 'play_turn'),
+    ('game', 'Game', 'move_enemy'),
+    ('pygame_renderer', 'PygameRenderer', 'display_labyrinth'),
+    ('pygame_renderer', 'PygameRenderer', 'draw'),
+]
+
+
+class Profile:
+    """ Time spent in each timed function and the counters, filled while profiling is enabled. """
+
+    def __init__(self):
+        # Name -> [calls, total seconds, longest call in seconds].
+        self.timers = {}
+        self.counters = {}
+
+    def add_time(self, name: str, seconds: float):
+        timer = self.timers.setdefault(name, [0, 0., 0.])
+        timer[0] += 1
+        timer[1] += seconds
+        timer[2] = max(timer[2], seconds)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self):
+        """ Return the timers (calls, total, mean and max in milliseconds) and the counters. """
+        counters = dict(self.counters)
+        frames = self.timers.get('PygameRenderer.draw', [0])[0]
+        if 'blits' in counters and frames:
+            counters['blits per frame'] = counters['blits'] / frames
+        return {
+            'timers': {name: {'calls': calls, 'total_ms': 1000 * total, 'mean_ms': 1000 * total / calls,
+                              'max_ms': 1000 * longest}
+                       for name, (calls, total, longest) in self.timers.items()},
+            'counters': counters
+        }
+
+    def summary(self):
+        """ Return the profile as a text table, the slowest timers first. """
+        lines = [f'{"timer":<34}{"calls":>8}{"total ms":>12}{"mean ms":>10}{"max ms":>10}']
+        for name, timer in sorted(self.as_dict()['timers'].items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f'{name:<34}{timer["calls"]:>8}{timer["total_ms"]:>12.2f}'
+                         f'{timer["mean_ms"]:>10.3f}{timer["max_ms"]:>10.3f}')
+        for name, value in sorted(self.as_dict()['counters'].items()):
+            value = f'{value:.1f}' if isinstance(value, float) else str(value)
+            lines.append(f'{name:<34}{value:>8}')
+        return '\n'.join(lines)
+
+    def dump_json(self, path: str):
+        """ Write the profile in a JSON file. """
+        with open(path, 'w') as file:
+            json.dump(self.as_dict(), file, indent=2)
+
+
+# Modules only instrumented if already imported.
+DISPLAY_MODULES = ['pygame_renderer']
+
+# Original methods replaced while profiling: (class, method name, original).
+_originals = []
+# Profile being filled, None when profiling is disabled.
+_profile = None
+
+
+def enable():
+    """ Start profiling, return the Profile being filled. Profiling twice restarts it. """
+    global _profile
+    disable()
+    profile = _profile = Profile()
+    for module, class_name, method in TIMED:
+        _patch(_class(module, class_name), method, _timed(profile, f'{class_name}.{method}'))
+
+    game_class = _class('game', 'Game')
+    _patch(game_class, 'play_turn', _counting_rejections(profile))
+    _patch(game_class, 'move_enemy', _counting_steps(profile))
+    _patch(_class('pygame_renderer', 'PygameRenderer'), '_blit', _counting(profile, 'blits'))
+    return profile
+
+
+def disable():
+    """ Stop profiling: put the original methods back. """
+    global _profile
+    _profile = None
+    while _originals:
+        cls, method, original = _originals.pop()
+        setattr(cls, method, original)
+
+
+@contextmanager
+def timer(name: str):
+    """ Time the block under the name while profiling is enabled, do nothing otherwise. """
+    profile = _profile
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.add_time(name, time.perf_counter() - start)
+
+
+def _class(module: str, class_name: str):
+    """ Return the class, None if it is in a display module not imported. """
+    if module in DISPLAY_MODULES and module not in sys.modules:
+        return None
+    return getattr(importlib.import_module(module), class_name)
+
+
+def _patch(cls, method: str, wrapper):
+    if cls is None:
+        return
+    original = cls.__dict__[method]
+    _originals.append((cls, method, original))
+    setattr(cls, method, wraps(original)(wrapper(original)))
+
+
+def _timed(profile: Profile, name: str):
+    def wrapper(function):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profile.add_time(name, time.perf_counter() - start)
+        return timed
+    return wrapper
+
+
+def _counting(profile: Profile, name: str):
+    def wrapper(function):
+        def counted(*args, **kwargs):
+            profile.count(name)
+            return function(*args, **kwargs)
+        return counted
+    return wrapper
+
+
+def _counting_rejections(profile: Profile):
+    def wrapper(play_turn):
+        def counted(game, action):
+            if action in DIRECTIONS and not game.is_move_possible(game.player, action)[0]:
+                profile.count('wall rejections')
+            return play_turn(game, action)
+        return counted
+    return wrapper
+
+
+def _counting_steps(profile: Profile):
+    def wrapper(move_enemy):
+        def counted(game, enemy):
+            profile.count('enemy steps', enemy.speed)
+            return move_enemy(game, enemy)
+        return counted
+    return wrapper
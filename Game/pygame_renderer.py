@@ -0,0 +1,289 @@
+""" File containing the pygame renderer: the labyrinth drawn in a window. """
+
+from functools import cache, cached_property
+
+from cfg import *
+from occupancy import Occupancy
+from renderer import ConsoleRenderer
+from sprite_atlas import SpriteAtlas
+
+import pygame
+
+
+@cache
+def key_map():
+    """ Return the pygame key codes of each action (see KEYS), pygame must be initialised. """
+    return {action: [pygame.key.key_code(name) for name in names] for action, names in KEYS.items()}
+
+
+class PygameRenderer(ConsoleRenderer):
+    """
+    Draw the labyrinth in a pygame window and print the messages in the terminal.
+    The window is opened by the first draw, and the fonts are loaded when first used.
+    """
+
+    def __init__(self, labyrinth, player, enemies, scale: int):
+        """
+
+        Parameters
+        ----------
+        labyrinth
+        player
+        enemies
+        scale : size of a cell in pixels
+        """
+        self.labyrinth = labyrinth
+        self.player = player
+        self.enemies = enemies
+        self.scale = scale
+
+        # Cells to redraw, everything is drawn the first time.
+        self.dirty = set()
+        self.full_redraw = True
+        # The window, opened by the first draw.
+        self.screen = None
+
+        # Steps of the enemies still to show: (enemy, position), and where the enemies are shown meanwhile.
+        self.steps = []
+        self.shown = {}
+        self.next_step = 0
+        # Enemies of each cell where they are shown, rebuilt on each full redraw,
+        # drawn in the order of the enemies whatever the order they came in.
+        self.occupants = Occupancy()
+        self.order = {enemy: i for i, enemy in enumerate(enemies)}
+
+    def _init_display(self):
+        self.img_scale = int(self.scale * 0.95)
+        self.distance = int(self.scale * 1.2)
+        self.padding = int(self.scale * 1.8)
+        self.shift = self.padding // 2 + self.scale // 2
+        self.lab_size = self.padding + self.distance * (self.labyrinth.size - 1) + 2 * self.scale
+        self.display_width = self.lab_size
+        self.display_height = self.lab_size
+
+        self.wall_shift = int((self.distance + self.scale) / 2)
+
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.display_width, self.display_height))  # set application dimensions
+        pygame.display.set_caption(TITLE)
+        self.screen.fill(BLACK)  # set application background color
+
+        # SPRITES, loaded and scaled once
+        self.sprites = SpriteAtlas(self.img_scale)
+        self.sprites.preload()
+
+        # LAYERS
+        self._init_layers()
+
+        pygame.display.flip()
+
+    @cached_property
+    def right_font(self):
+        # SysFont scans the fonts of the system, only done if some text is written.
+        return pygame.font.SysFont('Comic Sans MS', int(self.scale / 1.2))
+
+    @cached_property
+    def left_font(self):
+        return pygame.font.SysFont('Comic Sans MS', int(self.scale / 1.6))
+
+    def _init_layers(self):
+        """ Rasterise the walls once, and cover the undiscovered cells with the fog. """
+        size = (self.display_width, self.display_height)
+
+        # Walls, borders and cell outlines never change after the generation.
+        self.wall_layer = pygame.Surface(size, pygame.SRCALPHA)
+        for x in range(self.labyrinth.size):
+            for y in range(self.labyrinth.size):
+                rect = [x * self.distance + self.shift, y * self.distance + self.shift, self.scale, self.scale]
+                pygame.draw.rect(self.wall_layer, WHITE, rect, 1)
+                for start_point, end_point, color in self._wall_segments(x, y):
+                    pygame.draw.line(self.wall_layer, color, start_point, end_point, 5)
+
+        # The fog is lifted tile by tile as the player discovers the cells.
+        self.fog_layer = pygame.Surface(size, pygame.SRCALPHA)
+        self.fog_layer.fill(BLACK)
+        for cell in self.labyrinth.cells:
+            if self.labyrinth.index(cell.position) in self.player.visited:
+                self.fog_layer.fill((0, 0, 0, 0), self._tile(*cell.position))
+
+    def display_labyrinth(self):
+        """ Redraw the whole labyrinth in the window. """
+        if self.player.visited.all_revealed:
+            self.fog_layer.fill((0, 0, 0, 0))
+
+        self.occupants = Occupancy()
+        for enemy in self.enemies:
+            self.occupants.add(enemy, self.shown.get(enemy, enemy.position))
+
+        self.screen.fill(BLACK)
+        self._blit(self.wall_layer, (0, 0))
+        for x in range(self.labyrinth.size):
+            for y in range(self.labyrinth.size):
+                self._draw_content(x, y)
+        self._blit(self.fog_layer, (0, 0))
+        self._blit(self.sprites[IMG_PLAYER], self._point(*self.labyrinth.cells[self.player.position].position))
+
+        self.dirty.clear()
+        self.full_redraw = False
+        pygame.display.flip()
+
+    def draw(self):
+        """ Redraw the cells which changed since the last draw, the whole labyrinth the first time. """
+        if self.screen is None:
+            self._init_display()
+        if self.full_redraw:
+            self.display_labyrinth()
+            return
+
+        rects = []
+        for index in self.dirty:
+            x, y = self.labyrinth.cells[index].position
+            rect = self._tile(x, y)
+            self.screen.set_clip(rect)
+            self.screen.fill(BLACK, rect)
+            self._blit(self.wall_layer, rect, rect)
+            self._draw_content(x, y)
+            self._blit(self.fog_layer, rect, rect)
+            if self.player.position == index:
+                self._blit(self.sprites[IMG_PLAYER], self._point(x, y))
+            rects.append(rect)
+        self.screen.set_clip(None)
+
+        self.dirty.clear()
+        pygame.display.update(rects)
+
+    def changed(self, *positions):
+        self.dirty.update(position for position in positions if position is not None)
+
+    def revealed(self, *positions):
+        if self.screen is None:
+            # The fog is made from the discovered cells when the window opens.
+            return
+        for index in positions:
+            self.fog_layer.fill((0, 0, 0, 0), self._tile(*self.labyrinth.cells[index].position))
+            self.dirty.add(index)
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def enemy_moved(self, enemy, old_position):
+        """ Queue the steps of the enemies in the explored part of the labyrinth, to be shown by animate. """
+        if self.screen is None:
+            return
+        if enemy in self.shown or old_position in self.player.visited:
+            if not self.steps:
+                self.next_step = pygame.time.get_ticks() + ENEMY_STEP_TIME
+            self.shown.setdefault(enemy, old_position)
+            self.steps.append((enemy, enemy.position))
+        else:
+            self.occupants.move(enemy, old_position, enemy.position)
+
+    def animate(self):
+        """ Show the next step of the enemies once its time has come. """
+        if self.steps and pygame.time.get_ticks() >= self.next_step:
+            enemy, position = self.steps.pop(0)
+            self.changed(self.shown[enemy], position)
+            self.occupants.move(enemy, self.shown[enemy], position)
+            if any(step[0] is enemy for step in self.steps):
+                self.shown[enemy] = position
+            else:
+                del self.shown[enemy]
+            self.next_step += ENEMY_STEP_TIME
+            self.draw()
+        return bool(self.steps)
+
+    def skip_animation(self):
+        for enemy, position in self.shown.items():
+            self.changed(position, enemy.position)
+            self.occupants.move(enemy, position, enemy.position)
+        self.steps.clear()
+        self.shown.clear()
+
+    def _blit(self, source, dest, area=None):
+        """ Draw the surface on the window, every blit of a frame goes through here (see profiling). """
+        self.screen.blit(source, dest, area)
+
+    def _point(self, x: int, y: int):
+        """ Return the top left corner of the cell in the window. """
+        return x * self.distance + self.shift, y * self.distance + self.shift
+
+    def _tile(self, x: int, y: int):
+        """ Return the area of the window drawn for the cell: the cell, its walls and its borders. """
+        # Walls are lines 5 pixels wide, drawn a bit before the cells they follow.
+        offset = self.shift - int(self.shift * 0.92) + 2
+        left, top = self._point(x, y)
+        return pygame.Rect(left - offset, top - offset, self.distance + 5, self.distance + 5)
+
+    def _draw_content(self, x: int, y: int):
+        """ Draw the content of the cell and the enemies in it, the fog hides them if undiscovered. """
+        point = self._point(x, y)
+
+        index = self.labyrinth.index((x, y))
+        content = self.labyrinth.cells[index].content
+        if content != 'empty':
+            icon_path = CONTENT_IMAGES[content]
+            if content == 'river' and self.labyrinth.river_index[index] == 0:
+                icon_path = IMG_RIVER_START
+            self._blit(self.sprites[icon_path], point)
+
+        for enemy in sorted(self.occupants[index], key=self.order.get):
+            self._blit(self.sprites[ENEMY_IMAGES[enemy.enemy_type]], point)
+
+    def _wall_segments(self, x1: int, y1: int):
+        """ Return the (start, end, color) of the walls around the cell and of its borders. """
+        segments = []
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            x2, y2 = x1 + dx, y1 + dy
+            if self.labyrinth.is_inside((x2, y2)):
+                if not self.labyrinth.is_wall((x1, y1), (dx, dy)):
+                    continue
+                color = RED
+            else:
+                color = (0, 100, 148)
+
+            if x1 - x2 != 0:
+                start_point_x = max(x1, x2) * self.distance + int(self.shift * 0.92)
+                start_point_y = y1 * self.distance + self.shift
+                end_point_x = start_point_x
+                end_point_y = start_point_y + self.scale
+
+            if y1 - y2 != 0:
+                start_point_x = x1 * self.distance + self.shift
+                start_point_y = max(y1, y2) * self.distance + int(self.shift * 0.92)
+                end_point_x = start_point_x + self.scale
+                end_point_y = start_point_y
+
+            segments.append(((start_point_x, start_point_y), (end_point_x, end_point_y), color))
+        return segments
+
+    # def display_log(self):
+    #     """
+    #     Log Text display
+    #
+    #     Returns
+    #     -------
+    #
+    #     """
+    #     cli_texts = ['Hey there I only want to talk withyou!', 'YOU HAVE DONE THAT DEAR!', '3']
+    #     text_cli_texts = [self.left_font.render(f'{cli_text}', True, (25, 180, 200)) for cli_text in cli_texts]
+    #     for i, text_cli_text in enumerate(text_cli_texts):
+    #         self.screen.blit(text_cli_text,
+    #                          (int(self.padding / 2), int(self.scale * i * 0.8) + self.lab_size * 0.9))  # draw text
+    #     pygame.display.flip()
+    #
+    # def display_attributes(self):
+    #     """
+    #     Display attributes
+    #
+    #     Returns
+    #     -------
+    #
+    #     """
+    #     text_health_value = 0
+    #     text_turn_value = 0
+    #
+    #     text_health = self.right_font.render(f'Health: {str(text_health_value)}', True, (25, 180, 200))
+    #     text_turn = self.right_font.render(f'Turn: {str(text_turn_value)}', True, (25, 180, 200))
+    #     self.screen.blit(text_health, (self.lab_size, self.padding))  # draw text
+    #     self.screen.blit(text_turn, (self.lab_size, self.padding + self.scale))  # draw text
+    #     pygame.display.flip()
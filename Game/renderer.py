@@ -0,0 +1,55 @@
+""" File containing the renderer interface: how the game rules talk to a display. """
+
+from events import describe
+
+
+class Renderer:
+    """
+    Observer of the game. The base renderer shows nothing, so the rules
+    can run headless (simulations, servers) without a display or a terminal.
+    Positions are cell indexes (see Labyrinth.index).
+    """
+
+    def notify(self, events):
+        """ Called with the events of each turn (see events), tells the player about them. """
+        for event in events:
+            text = describe(event)
+            if text is not None:
+                self.message(text)
+
+    def message(self, text: str):
+        """ Tell the player what just happened. """
+
+    def draw(self):
+        """ Refresh the display. """
+
+    def changed(self, *positions):
+        """ The look of the cells changed: walker in or out, content taken or dropped. """
+
+    def revealed(self, *positions):
+        """ The player discovered the cells. """
+
+    def invalidate(self):
+        """ Everything must be redrawn. """
+
+    def enemy_moved(self, enemy, old_position):
+        """ Called after each step of an enemy. """
+
+    def animate(self):
+        """ Show the next frame of the animations, return True while some are running. """
+        return False
+
+    def skip_animation(self):
+        """ Jump to the end of the animations. """
+
+
+class ConsoleRenderer(Renderer):
+    """ Print the messages in the terminal, those of a turn at once. """
+
+    def notify(self, events):
+        texts = [text for text in map(describe, events) if text is not None]
+        if texts:
+            print('\n'.join(texts))
+
+    def message(self, text: str):
+        print(text)
@@ -0,0 +1,256 @@
+""" File containing the recordings: the actions of a game, to play it again.
+
+A recording is a header (see HEADER) followed by:
+    enemies      one byte per enemy type
+    algorithm    the name of the maze algorithm in utf-8
+    name         the name of the player in utf-8
+    actions      two actions per byte, the index in ACTIONS of the first one in the high nibble
+    checkpoints  (turn, player position, health, flags, crc32 of the enemy positions) of the
+                 state after the placement and every REPLAY_CHECKPOINT_TURNS turns
+Numbers are little-endian. The labyrinth and the game are rebuilt from their seeds,
+so the recording of a long game takes a few bytes per hundred turns.
+
+Run from the Game directory to replay a recording, headless at full speed:
+    python replay.py game.rec
+or drawn in a window at 5 turns per second:
+    python replay.py game.rec --scale 60 --speed 5
+The replay stops at the first checkpoint the game does not match, and exits with status 1.
+"""
+
+import argparse
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from cfg import ACTIONS, FRAME_RATE, REPLAY_CHECKPOINT_TURNS
+from enemy import Enemy
+from game import Game
+from labyrinth import Labyrinth
+from player import Player
+
+MAGIC = b'LREC'
+# Version 2: rivers of the labyrinths larger than RIVER_SEARCH_SIZE follow a cycle, the treasure dropped
+# falls on an empty cell.
+# Version 3: the maze generators, the inner walls opened and the free cells draw their random numbers
+# in another order.
+VERSION = 3
+
+# magic, version, size, labyrinth seed, game seed, health, enemies, algorithm and name lengths,
+# actions and checkpoints
+HEADER = struct.Struct('<4sHIQQiHBHII')
+CHECKPOINT = struct.Struct('<IIiBI')
+HAS_TREASURE = 1
+GAME_OVER = 2
+
+
+def state(game: Game):
+    """ Return the checkpoint of the game: player position, health, flags and crc32 of the enemy positions. """
+    flags = HAS_TREASURE * game.player.have_treasure | GAME_OVER * game.game_over
+    enemies = array('I', [enemy.position for enemy in game.enemies])
+    if sys.byteorder == 'big':
+        enemies.byteswap()
+    return game.player.position, game.player.health, flags, zlib.crc32(enemies.tobytes())
+
+
+class Recording:
+    """ What it takes to play a game again: the seeds, the walkers and the actions, with checkpoints. """
+
+    def __init__(self, size: int, algorithm: str, labyrinth_seed: int, game_seed: int, name: str, health: int,
+                 enemy_types: list, actions=(), checkpoints=None):
+        """
+
+        Parameters
+        ----------
+        size, algorithm, labyrinth_seed : the labyrinth, see Labyrinth
+        game_seed : seed of the random draws of the game
+        name, health : the player when the game starts
+        enemy_types : type of each enemy
+        actions : actions played, one of ACTIONS each
+        checkpoints : dict turn -> state of the game after the turn (see state)
+        """
+        self.size = size
+        self.algorithm = algorithm
+        self.labyrinth_seed = labyrinth_seed
+        self.game_seed = game_seed
+        self.name = name
+        self.health = health
+        self.enemy_types = enemy_types
+        self.actions = list(actions)
+        self.checkpoints = checkpoints if checkpoints is not None else {}
+
+    def new_game(self, renderer=None):
+        """ Return the game of the recording with the walkers placed, before the first turn.
+
+        renderer is the function making the renderer of (labyrinth, player, enemies), headless if None.
+        """
+        labyrinth = Labyrinth(self.size, self.algorithm, seed=self.labyrinth_seed)
+        player = Player(self.name, health=self.health)
+        enemies = [Enemy(enemy_type=enemy_type) for enemy_type in self.enemy_types]
+        game = Game(labyrinth, player, enemies, renderer(labyrinth, player, enemies) if renderer else None,
+                    seed=self.game_seed)
+        game.place_player()
+        game.place_enemies()
+        return game
+
+    def save(self, path: str):
+        """ Write the recording to a file. """
+        algorithm, name = self.algorithm.encode(), self.name.encode()
+        codes = [ACTIONS.index(action) for action in self.actions] + [0]
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.size, self.labyrinth_seed, self.game_seed, self.health,
+                                   len(self.enemy_types), len(algorithm), len(name), len(self.actions),
+                                   len(self.checkpoints)))
+            file.write(bytes(self.enemy_types) + algorithm + name)
+            file.write(bytes(codes[i] << 4 | codes[i + 1] for i in range(0, len(self.actions), 2)))
+            for turn, checkpoint in sorted(self.checkpoints.items()):
+                file.write(CHECKPOINT.pack(turn, *checkpoint))
+
+
+def load(path: str):
+    """ Read a recording written by Recording.save. """
+    with open(path, 'rb') as file:
+        data = file.read()
+    (magic, version, size, labyrinth_seed, game_seed, health, n_enemies, algorithm_length, name_length,
+     n_actions, n_checkpoints) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a recording')
+    if version != VERSION:
+        raise ValueError(f'{path} is a recording of version {version}, expected {VERSION}')
+
+    offset = HEADER.size
+    enemy_types = list(data[offset:offset + n_enemies])
+    offset += n_enemies
+    algorithm = data[offset:offset + algorithm_length].decode()
+    offset += algorithm_length
+    name = data[offset:offset + name_length].decode()
+    offset += name_length
+    packed = data[offset:offset + (n_actions + 1) // 2]
+    offset += len(packed)
+    actions = [ACTIONS[byte >> shift & 15] for byte in packed for shift in (4, 0)][:n_actions]
+    checkpoints = {}
+    for _ in range(n_checkpoints):
+        turn, *checkpoint = CHECKPOINT.unpack_from(data, offset)
+        checkpoints[turn] = tuple(checkpoint)
+        offset += CHECKPOINT.size
+    return Recording(size, algorithm, labyrinth_seed, game_seed, name, health, enemy_types, actions, checkpoints)
+
+
+class Recorder:
+    """ Record the actions of a game as they are played, see record. """
+
+    def __init__(self, game: Game):
+        """ Start recording a game just placed (see Game.place_player and Game.place_enemies).
+
+        The labyrinth must be a Labyrinth, not a chunked or a loaded one, and the
+        labyrinth and the game must have been made from a seed.
+        """
+        if type(game.labyrinth) is not Labyrinth:
+            raise ValueError(f'Only the games of a Labyrinth can be recorded, not of a {type(game.labyrinth).__name__}')
+        if game.labyrinth.seed is None or game.seed is None:
+            raise ValueError('Only the games of a seeded labyrinth and a seeded game can be recorded')
+        self.game = game
+        self.recording = Recording(game.labyrinth.size, game.labyrinth.algorithm, game.labyrinth.seed, game.seed,
+                                   game.player.name, game.player.health, [enemy.enemy_type for enemy in game.enemies],
+                                   checkpoints={0: state(game)})
+
+    def record(self, action: str):
+        """ Record the action, once played by the game. """
+        self.recording.actions.append(action)
+        turn = len(self.recording.actions)
+        if turn % REPLAY_CHECKPOINT_TURNS == 0 or self.game.game_over:
+            self.recording.checkpoints[turn] = state(self.game)
+
+    def save(self, path: str):
+        """ Write the recording, with a checkpoint of the last turn. """
+        turn = len(self.recording.actions)
+        self.recording.checkpoints[turn] = state(self.game)
+        self.recording.save(path)
+
+
+def replay(recording: Recording, game: Game = None, after_turn=None):
+    """ Play the actions of the recording, checking the state of the game at the checkpoints.
+
+    Parameters
+    ----------
+    recording : Recording
+    game : game to play, recording.new_game() by default
+    after_turn : function called with the game after each turn
+
+    Returns
+    -------
+    stats : dict with the turns played, seconds, turns per second, and the divergence:
+            None, or (turn, recorded state, replayed state) at the first checkpoint missed
+    """
+    game = game if game is not None else recording.new_game()
+    divergence = None
+    if state(game) != recording.checkpoints.get(0, state(game)):
+        divergence = (0, recording.checkpoints[0], state(game))
+
+    turns = 0
+    start = time.perf_counter()
+    for action in recording.actions if divergence is None else []:
+        game.play_turn(action)
+        turns += 1
+        checkpoint = recording.checkpoints.get(turns)
+        if checkpoint is not None and state(game) != checkpoint:
+            divergence = (turns, checkpoint, state(game))
+            break
+        if after_turn is not None:
+            after_turn(game)
+    seconds = time.perf_counter() - start
+    return {
+        'turns': turns,
+        'seconds': seconds,
+        'turns_per_second': turns / seconds if seconds else float('inf'),
+        'divergence': divergence
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play a recorded game again')
+    parser.add_argument('paths', nargs='+', help='recordings to play')
+    parser.add_argument('--scale', type=int, help='draw the game in a window, cells of this size in pixels')
+    parser.add_argument('--speed', type=float, default=5, help='turns per second when drawn')
+    args = parser.parse_args(argv)
+
+    diverged = False
+    for path in args.paths:
+        recording = load(path)
+        if args.scale:
+            from pygame_renderer import PygameRenderer
+
+            def renderer(labyrinth, player, enemies):
+                return PygameRenderer(labyrinth, player, enemies, args.scale)
+
+            game = recording.new_game(renderer)
+            game.renderer.draw()
+            stats = replay(recording, game, lambda game: _wait(game.renderer, 1 / args.speed))
+        else:
+            stats = replay(recording)
+
+        print(f'{path}: {stats["turns"]} turns in {stats["seconds"]:.4f} s, '
+              f'{stats["turns_per_second"]:.0f} turns/s')
+        if stats['divergence'] is not None:
+            turn, recorded, replayed = stats['divergence']
+            print(f'  diverged at turn {turn}: recorded {recorded}, replayed {replayed}')
+            diverged = True
+    return 1 if diverged else 0
+
+
+def _wait(renderer, seconds: float):
+    """ Show the animations of the turn while waiting for the next one. """
+    import pygame
+
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        renderer.animate()
+        pygame.event.pump()
+        time.sleep(1 / FRAME_RATE)
+    renderer.skip_animation()
+    renderer.draw()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+""" File containing the index of the river: the place of each of its cells, from the source. """
+
+from array import array
+from collections.abc import Mapping
+
+
+class RiverIndex(Mapping):
+    """
+    Read-only mapping of the cell indexes of the river to their place in it.
+    The places are kept in an array of one int per cell, -1 out of the river,
+    and the keys come in the order of the river.
+    """
+
+    def __init__(self, river, n_cells: int):
+        """ Index the river, a sequence of cell indexes from the source, in a labyrinth of n_cells cells. """
+        self._river = river
+        self._places = array('i', [-1]) * n_cells
+        for place, index in enumerate(river):
+            self._places[index] = place
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self._places) or self._places[index] < 0:
+            raise KeyError(index)
+        return self._places[index]
+
+    def __contains__(self, index):
+        return 0 <= index < len(self._places) and self._places[index] >= 0
+
+    def __iter__(self):
+        return iter(self._river)
+
+    def __len__(self):
+        return len(self._river)
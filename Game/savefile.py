@@ -0,0 +1,246 @@
+""" File containing the save files: labyrinths and games in a compact binary format.
+
+A save file is a header (see HEADER) followed by packed arrays:
+    walls      size * size bytes, the closed sides of the cells (see WALL_BITS)
+    contents   size * size bytes, the index in CONTENTS of the content of the cells
+    river      uint32 cell indexes, from the source
+    wormholes  uint32 cell indexes, each wormhole leading to the next one
+    objects    uint32 cell indexes of the exit, the treasure and the map
+    enemies    uint32 cell indexes (UNPLACED if not placed), then one byte per enemy type
+    fog        size * size bits, the cells discovered by the player
+    name       the name of the player in utf-8
+Numbers are little-endian, and the uint32 arrays start on a multiple of 4 bytes.
+
+load_labyrinth maps the file in memory instead of reading it: nothing is built for
+each cell up front, and the processes loading the same file share its pages. The
+changes made by a game stay private to its process and never reach the file.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from functools import cached_property
+
+from cfg import CONTENTS, SPECIAL_CONTENT
+from enemy import Enemy
+from free_cells import FreeCells
+from game import Game
+from labyrinth import Labyrinth
+from lazy_view import LazyView
+from player import Player
+from river_index import RiverIndex
+
+MAGIC = b'LABY'
+VERSION = 1
+HAS_GAME = 1
+# Position of a walker not placed yet in the uint32 arrays, -1 as a uint32.
+UNPLACED = 0xFFFFFFFF
+
+# magic, version, flags, size, river, wormholes, objects and enemies lengths,
+# player position (-1 if not placed), health, have_treasure, game_over, fog all revealed, name length
+HEADER = struct.Struct('<4sHHIIIIIiiBBBxI')
+
+
+def _uint32(values):
+    """ Return the little-endian bytes of the uint32 values. """
+    values = array('I', values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_uint32(buffer: memoryview):
+    """ Return the uint32 of little-endian bytes, a view on them if possible. """
+    if sys.byteorder == 'big':
+        values = array('I', buffer.tobytes())
+        values.byteswap()
+        return values
+    return buffer.cast('I')
+
+
+def save_labyrinth(path: str, labyrinth: Labyrinth):
+    """ Write the labyrinth to a save file. """
+    _write(path, labyrinth)
+
+
+def save_game(path: str, game: Game):
+    """ Write the game, its labyrinth, its walkers and the fog of the player, to a save file. """
+    _write(path, game.labyrinth, game)
+
+
+def _write(path: str, labyrinth: Labyrinth, game: Game = None):
+    size = labyrinth.size
+    river = [labyrinth.index(cell.position) for cell in labyrinth.river]
+    wormholes = [labyrinth.index(cell.position) for cell in labyrinth.wormholes]
+    objects = sorted(labyrinth.contents['exit'] | labyrinth.contents['treasure'] | labyrinth.contents['map'])
+
+    fog = bytearray((size ** 2 + 7) // 8)
+    enemies, enemy_types, name = [], b'', b''
+    player = {'position': -1, 'health': 0, 'have_treasure': False, 'game_over': False, 'all_revealed': False}
+    if game is not None:
+        enemies = [UNPLACED if enemy.position is None else enemy.position for enemy in game.enemies]
+        enemy_types = bytes(enemy.enemy_type for enemy in game.enemies)
+        name = game.player.name.encode()
+        for index in game.player.visited:
+            fog[index // 8] |= 1 << index % 8
+        player = {'position': -1 if game.player.position is None else game.player.position,
+                  'health': game.player.health, 'have_treasure': game.player.have_treasure,
+                  'game_over': game.game_over, 'all_revealed': game.player.visited.all_revealed}
+
+    header = HEADER.pack(MAGIC, VERSION, HAS_GAME if game is not None else 0, size,
+                         len(river), len(wormholes), len(objects), len(enemies),
+                         player['position'], player['health'], player['have_treasure'], player['game_over'],
+                         player['all_revealed'], len(name))
+    grids = bytes(labyrinth.walls) + bytes(labyrinth._contents)
+    with open(path, 'wb') as file:
+        file.write(header)
+        file.write(grids)
+        file.write(bytes(-(len(header) + len(grids)) % 4))
+        for values in [river, wormholes, objects, enemies]:
+            file.write(_uint32(values))
+        file.write(enemy_types)
+        file.write(fog)
+        file.write(name)
+
+
+class MappedLabyrinth(Labyrinth):
+    """
+    Labyrinth read from the memory map of a save file (see load_labyrinth).
+    The cells are made when they are asked for, the indexes of the river,
+    of the contents and of the free cells the first time they are used.
+    """
+
+    def __init__(self, buffer: mmap.mmap):
+        """ Read the labyrinth part of a save file mapped in memory. """
+        self._map = buffer
+        self.header = HEADER.unpack_from(buffer)
+        magic, version, _, size, n_river, n_wormholes, n_objects = self.header[:7]
+        if magic != MAGIC:
+            raise ValueError('Not a labyrinth save file')
+        if version != VERSION:
+            raise ValueError(f'Unsupported save file version: {version}, expected {VERSION}')
+
+        self.size = size
+        self.algorithm = None
+        view = memoryview(buffer)
+        offset = HEADER.size
+        self.walls = view[offset:offset + size ** 2]
+        self._contents = view[offset + size ** 2:offset + 2 * size ** 2]
+        offset += 2 * size ** 2
+        offset += -offset % 4
+        arrays = []
+        for length in [n_river, n_wormholes, n_objects]:
+            arrays.append(_read_uint32(view[offset:offset + 4 * length]))
+            offset += 4 * length
+        self._river, wormholes, self._objects = arrays
+        self._offset = offset
+
+        self.cells = LazyView(self._cell, size ** 2)
+        self.exits = self._init_exits()
+        self.river = LazyView(lambda i: self.cells[self._river[i]], n_river)
+        self.wormholes = [self.cells[index] for index in wormholes]
+        self.wormhole_next = dict(zip(wormholes, list(wormholes[1:]) + list(wormholes[:1])))
+        self._free = None
+
+    @cached_property
+    def river_index(self):
+        return RiverIndex(self._river, self.size ** 2)
+
+    @cached_property
+    def contents(self):
+        contents = {content: set() for content in SPECIAL_CONTENT if content != 'river'}
+        for index in set(self.wormhole_next) | set(self._objects):
+            content = CONTENTS[self._contents[index]]
+            if content in contents:
+                contents[content].add(index)
+        return contents
+
+    @property
+    def free(self):
+        if self._free is None:
+            self._free = FreeCells(self.size ** 2)
+            for index in self._river:
+                self._free.discard(index)
+            for indexes in self.contents.values():
+                for index in indexes:
+                    self._free.discard(index)
+        return self._free
+
+    @cached_property
+    def exit(self):
+        for index in self.contents['exit']: return index
+
+    @property
+    def exit_cell(self):
+        return self.cells[self.exit]
+
+    def set_content(self, index: int, content: str):
+        """ Put the content in the cell of the index, updating the indexes of the contents. """
+        contents = self.contents
+        old_content = CONTENTS[self._contents[index]]
+        if old_content in contents:
+            contents[old_content].discard(index)
+        if content in contents:
+            contents[content].add(index)
+        if self._free is not None:
+            if content == 'empty':
+                self._free.add(index)
+            else:
+                self._free.discard(index)
+        self._contents[index] = CONTENTS.index(content)
+
+
+def _map(path: str):
+    with open(path, 'rb') as file:
+        # A private copy on write: the pages are shared until a game changes them.
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
+def load_labyrinth(path: str):
+    """ Map the labyrinth of a save file in memory.
+
+    Returns
+    -------
+    labyrinth : MappedLabyrinth
+    """
+    return MappedLabyrinth(_map(path))
+
+
+def load_game(path: str, renderer=None):
+    """ Map the labyrinth of a save file in memory and restore the game saved with it.
+
+    Returns
+    -------
+    game : Game, with the given renderer
+    """
+    labyrinth = MappedLabyrinth(_map(path))
+    flags, size, n_enemies = labyrinth.header[2], labyrinth.size, labyrinth.header[7]
+    position, health, have_treasure, game_over, all_revealed, name_length = labyrinth.header[8:]
+    if not flags & HAS_GAME:
+        raise ValueError('The save file only holds a labyrinth')
+
+    view = memoryview(labyrinth._map)
+    offset = labyrinth._offset
+    positions = _read_uint32(view[offset:offset + 4 * n_enemies])
+    offset += 4 * n_enemies
+    enemy_types = view[offset:offset + n_enemies]
+    offset += n_enemies
+    fog = view[offset:offset + (size ** 2 + 7) // 8]
+    offset += len(fog)
+    name = view[offset:offset + name_length].tobytes().decode()
+
+    player = Player(name, None if position < 0 else position, health, bool(have_treasure))
+    for byte_index, byte in enumerate(fog):
+        while byte:
+            bit = byte & -byte
+            player.visited.reveal(byte_index * 8 + bit.bit_length() - 1)
+            byte ^= bit
+    if all_revealed:
+        player.visited.reveal_all()
+    enemies = [Enemy(None if position == UNPLACED else position, enemy_type)
+               for position, enemy_type in zip(positions, enemy_types)]
+
+    game = Game(labyrinth, player, enemies, renderer)
+    game.game_over = bool(game_over)
+    return game
@@ -0,0 +1,195 @@
+""" File containing the solver: reachability and shortest paths in a labyrinth.
+
+The graph of a labyrinth has a node per cell and an edge per way the player can
+change cells in a turn:
+    a move through an open side, weight 1, leading downstream if the side opens on
+    the river (the current carries the player two cells at the end of the turn);
+    a turn spent in the river, weight 0, carried two cells downstream;
+    a wormhole activated, weight 0, leading to the next wormhole.
+The weight counts the cells walked: a breadth-first search gives the number of
+turns between two cells, a 0-1 breadth-first search the number of cells walked.
+"""
+
+import time
+from collections import deque
+
+from labyrinth import Labyrinth
+from cfg import MAZE_ALGORITHM
+
+
+class DisjointSet:
+    """ Union-find of the cell indexes, with path halving and union by size. """
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+        self.n_sets = n
+
+    def find(self, index: int):
+        """ Return the representative of the set of the index. """
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(self, a: int, b: int):
+        """ Merge the sets of a and b, return False if they were already the same. """
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.n_sets -= 1
+        return True
+
+
+def components(labyrinth):
+    """ Return the union-find of the cells linked by a passage or a wormhole, whatever the current. """
+    sets = DisjointSet(labyrinth.size ** 2)
+    for index, exits in enumerate(labyrinth.exits):
+        for neighbour in exits:
+            if neighbour > index:
+                sets.union(index, neighbour)
+    for wormhole, next_wormhole in labyrinth.wormhole_next.items():
+        sets.union(wormhole, next_wormhole)
+    return sets
+
+
+def graph(labyrinth):
+    """ Return the edges of the labyrinth: for each cell index, the list of its (cell, weight). """
+    river = sorted(labyrinth.river_index, key=labyrinth.river_index.get)
+
+    def drift(index):
+        if index in labyrinth.river_index:
+            return river[min(labyrinth.river_index[index] + 2, len(river) - 1)]
+        return index
+
+    edges = []
+    for index, exits in enumerate(labyrinth.exits):
+        cell_edges = [(drift(neighbour), 1) for neighbour in exits]
+        if drift(index) != index:
+            cell_edges.append((drift(index), 0))
+        if index in labyrinth.wormhole_next:
+            cell_edges.append((labyrinth.wormhole_next[index], 0))
+        edges.append(cell_edges)
+    return edges
+
+
+def reverse(edges):
+    """ Return the edges of the graph with their directions swapped. """
+    reversed_edges = [[] for _ in edges]
+    for index, cell_edges in enumerate(edges):
+        for neighbour, weight in cell_edges:
+            reversed_edges[neighbour].append((index, weight))
+    return reversed_edges
+
+
+def turns(edges, start: int):
+    """ Breadth-first search: return the number of turns from start to each cell, -1 if out of reach. """
+    distance = [-1] * len(edges)
+    distance[start] = 0
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for index in frontier:
+            for neighbour, _ in edges[index]:
+                if distance[neighbour] < 0:
+                    distance[neighbour] = distance[index] + 1
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+    return distance
+
+
+def walked(edges, start: int):
+    """ 0-1 breadth-first search: return the number of cells walked from start to each cell, -1 if out of reach. """
+    distance = [-1] * len(edges)
+    distance[start] = 0
+    queue = deque([start])
+    while queue:
+        index = queue.popleft()
+        for neighbour, weight in edges[index]:
+            if distance[neighbour] < 0 or distance[index] + weight < distance[neighbour]:
+                distance[neighbour] = distance[index] + weight
+                if weight:
+                    queue.append(neighbour)
+                else:
+                    queue.appendleft(neighbour)
+    return distance
+
+
+def path(edges, start: int, goal: int):
+    """ Return the cells of a path of the fewest turns from start to goal, None if out of reach. """
+    previous = {start: None}
+    frontier = [start]
+    while frontier and goal not in previous:
+        next_frontier = []
+        for index in frontier:
+            for neighbour, _ in edges[index]:
+                if neighbour not in previous:
+                    previous[neighbour] = index
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+    if goal not in previous:
+        return None
+    cells = [goal]
+    while previous[cells[-1]] is not None:
+        cells.append(previous[cells[-1]])
+    return cells[::-1]
+
+
+def validate(labyrinth):
+    """ Check that the player can win from any cell: reach the treasure, then the exit.
+
+    Returns
+    -------
+    problems : list of str, empty if the labyrinth is solvable
+    difficulty : turns of the longest game: from the farthest cell to the treasure, then to the exit
+    """
+    problems = []
+    if components(labyrinth).n_sets > 1:
+        problems.append('some cells are cut off')
+
+    edges = graph(labyrinth)
+    treasure = next(iter(labyrinth.contents['treasure']))
+    exit_index = labyrinth.exit
+    to_treasure = turns(reverse(edges), treasure)
+    to_exit = turns(edges, treasure)[exit_index]
+
+    stuck = [index for index, distance in enumerate(to_treasure) if distance < 0]
+    if stuck:
+        problems.append(f'the treasure is out of reach from {len(stuck)} cells')
+    if to_exit < 0:
+        problems.append('the exit is out of reach from the treasure')
+    difficulty = max(to_treasure) + to_exit if not problems else -1
+    return problems, difficulty
+
+
+def validate_seeds(size: int, seeds, algorithm: str = MAZE_ALGORITHM):
+    """ Generate and validate the labyrinth of each seed.
+
+    Returns
+    -------
+    stats : dict with the number of labyrinths, the failed seeds and their problems,
+            the mean difficulty of the others, seconds and labyrinths per minute
+    """
+    failures = {}
+    difficulties = []
+    start = time.perf_counter()
+    for seed in seeds:
+        problems, difficulty = validate(Labyrinth(size, algorithm, seed=seed))
+        if problems:
+            failures[seed] = problems
+        else:
+            difficulties.append(difficulty)
+    seconds = time.perf_counter() - start
+    n_labyrinths = len(failures) + len(difficulties)
+    return {
+        'labyrinths': n_labyrinths,
+        'failures': failures,
+        'mean_difficulty': sum(difficulties) / len(difficulties) if difficulties else float('nan'),
+        'seconds': seconds,
+        'labyrinths_per_minute': 60 * n_labyrinths / seconds if seconds else float('inf')
+    }
@@ -0,0 +1,45 @@
+""" File containing the sprite atlas: the images of the game, loaded and scaled once. """
+
+from cfg import *
+
+import pygame
+
+
+class SpriteAtlas:
+    """
+    Cache of the images of the game scaled to the size of a cell.
+    Every image is read from the disk once, and scaled again only when the scale changes.
+    The display mode must be set before the first use (images are converted to it).
+    """
+
+    def __init__(self, img_scale: int):
+        """
+
+        Parameters
+        ----------
+        img_scale : size of a sprite in pixels
+        """
+        self.img_scale = img_scale
+        self._images = {}
+        self._sprites = {}
+
+    def set_scale(self, img_scale: int):
+        """ Change the size of the sprites, the scaled images are dropped if it changed. """
+        if img_scale != self.img_scale:
+            self.img_scale = img_scale
+            self._sprites.clear()
+
+    def preload(self):
+        """ Load and scale all the images of the game. """
+        for path in IMAGES:
+            self[path]
+
+    def __getitem__(self, path: str):
+        """ Return the sprite of the image file. """
+        sprite = self._sprites.get(path)
+        if sprite is None:
+            image = self._images.get(path)
+            if image is None:
+                image = self._images[path] = pygame.image.load(path).convert_alpha()
+            sprite = self._sprites[path] = pygame.transform.scale(image, (self.img_scale, self.img_scale))
+        return sprite
@@ -7,6 +7,6 @@ class Walker:
 
         Parameters
         ----------
-        position :
+        position : index of the cell of the walker (see Labyrinth.index)
         """
         self.position = position